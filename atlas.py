@@ -0,0 +1,148 @@
+"""
+Texture atlas: packs many small images in a few big surfaces.
+
+Blitting from a handful of big pages instead of hundreds of scattered surfaces improves memory locality and leaves
+fewer surfaces to rescale when the zoom changes.
+"""
+
+from typing import Dict, Hashable, List, Tuple
+
+import pygame
+import logging
+
+import utils
+
+
+class Atlas(object):
+    """
+    A set of pages (big per pixel alpha surfaces) where images are packed in shelves.
+
+    Every image is identified by a hashable key. The lookup table rects maps keys to (page index, rect), while
+    atlas[key] returns a subsurface of the page: it shares the page pixels, so it can be blit (or drawn on) like
+    any other surface.
+
+    The atlas is tied to a scale (e.g. the map zoom): when set_scale changes it, every region is dropped and
+    users have to repack their images.
+    """
+
+    def __init__(self, page_size: Tuple[int, int] = (1024, 1024)):
+        """
+        :param page_size: size of each page. Images bigger than this get a page of their own.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.page_size = page_size
+        self.scale = None
+        self.pages: List[pygame.Surface] = []
+        self.rects: Dict[Hashable, Tuple[int, pygame.Rect]] = {}
+        self._regions: Dict[Hashable, pygame.Surface] = {}
+        self._shelf_page = None  # index of the page shelves are being packed in
+        self._shelf_x = self._shelf_y = self._shelf_h = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.rects
+
+    def __getitem__(self, key: Hashable) -> pygame.Surface:
+        return self._regions[key]
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def set_scale(self, scale) -> None:
+        """
+        Clears the atlas if scale changed.
+        """
+        if scale != self.scale:
+            self.clear()
+            self.scale = scale
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Forgets the region bound to key, if any. Shelves are not repacked, so its space is reused only after clear.
+        """
+        self.rects.pop(key, None)
+        self._regions.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drops all pages and regions. Surfaces previously returned keep their pixels alive until released.
+        """
+        self.pages = []
+        self.rects = {}
+        self._regions = {}
+        self._shelf_page = None
+        self._shelf_x = self._shelf_y = self._shelf_h = 0
+
+    def _new_page(self, size: Tuple[int, int]) -> int:
+        page = utils.convert(pygame.Surface(size, flags=pygame.SRCALPHA))
+        page.fill((0, 0, 0, 0))
+        self.pages.append(page)
+        self.logger.debug("New %dx%d page (%d pages)", size[0], size[1], len(self.pages))
+        return len(self.pages) - 1
+
+    def _pack(self, size: Tuple[int, int]) -> Tuple[int, pygame.Rect]:
+        w, h = size
+        page_w, page_h = self.page_size
+        if w > page_w or h > page_h:
+            # too big: give it a page of its own, leaving the current shelf untouched
+            return self._new_page(size), pygame.Rect((0, 0), size)
+        if self._shelf_x + w > page_w:
+            # new shelf
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_h
+            self._shelf_h = 0
+        if self._shelf_page is None or self._shelf_y + h > page_h:
+            # new page
+            self._shelf_page = self._new_page(self.page_size)
+            self._shelf_x = self._shelf_y = self._shelf_h = 0
+        rect = pygame.Rect((self._shelf_x, self._shelf_y), size)
+        self._shelf_x += w
+        self._shelf_h = max(self._shelf_h, h)
+        return self._shelf_page, rect
+
+    def reserve(self, key: Hashable, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Returns a transparent region of the given size bound to key, allocating it if needed.
+
+        If key already has a region of the same size it is returned untouched.
+        :param key: any hashable identifying the image.
+        :param size: width and height of the region.
+        :return: a subsurface of one of the pages.
+        """
+        size = (int(size[0]), int(size[1]))
+        if key in self.rects and self.rects[key][1].size == size:
+            return self._regions[key]
+        page, rect = self._pack(size)
+        self.rects[key] = page, rect
+        region = self._regions[key] = self.pages[page].subsurface(rect)
+        return region
+
+    def add(self, key: Hashable, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Copies surface in the atlas.
+        :param key: any hashable identifying the image.
+        :param surface: the image to copy.
+        :return: the region of the atlas holding the copy.
+        """
+        region = self.reserve(key, surface.get_size())
+        region.fill((0, 0, 0, 0))
+        region.blit(surface, (0, 0))
+        return region
+
+    def add_scaled(self, key: Hashable, surface: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Scales surface straight into the atlas, without allocating intermediate surfaces.
+        :param key: any hashable identifying the image.
+        :param surface: the image to scale.
+        :param size: the size of the scaled image.
+        :return: the region of the atlas holding the scaled image.
+        """
+        region = self.reserve(key, size)
+        pygame.transform.scale(surface, region.get_size(), region)
+        return region
+
+    def blit(self, key: Hashable, dest: pygame.Surface, pos: Tuple[int, int]) -> pygame.Rect:
+        """
+        Blits the image bound to key on dest at pos, straight from the page.
+        """
+        page, rect = self.rects[key]
+        return dest.blit(self.pages[page], pos, rect)
@@ -9,23 +9,32 @@ import resources
 import utils
 import colors as c
 import fonts
+import hud
+import profiler
+import surfacepool
 
-import math
+from typing import Callable, Dict, List, Tuple
 
-from typing import Tuple
 
-
-window = None
+window = None  #: what rooms draw on: the display surface, or a logical_resolution surface scaled to it by flip
 resolution = (1280, 720)
+logical_resolution = None  #: if not None everything is laid out and drawn at this size, whatever the window size
+smooth_scaling = False  #: whether flip scales the logical resolution with smoothscale instead of the faster scale
 min_resolution = (800, 600)
 fps = 60
 clock = None
 mode = pygame.RESIZABLE
-spinner_angle = 0
-spinner_size = (15, 15)
 FPS_FONT = None
 
+modeset_hooks: List[Callable[[], None]] = []  #: called after every modeset, when what was on the display is lost
+
+_overlays: Dict[Tuple[int, int, int], pygame.Surface] = {}  # window sized surfaces filled with a color, see overlay
+_backdrop = None  # window sized surface reused by every snapshot
+_viewport = None  # area of the display surface where window is scaled, see flip
+_viewport_for = None  # display surface size _viewport was computed for
+
 pygame.mixer.pre_init(frequency=44100, size=-16, channels=2)
+hud.panels.insert(0, profiler.draw_overlay)
 
 
 def initialize() -> None:
@@ -40,7 +49,7 @@ def initialize() -> None:
     pygame.display.set_icon(resources.load_image('icon.png'))
     version = utils.get_version()
 
-    window = pygame.display.set_mode(resolution, mode)
+    modeset()
     pygame.display.set_caption("Ice Emblem " + version)
     pygame.key.set_repeat(200, 50)
     clock = pygame.time.Clock()
@@ -52,10 +61,34 @@ def initialize() -> None:
 
 def modeset() -> None:
     """
-    Create a window.
+    Create a window. With a logical resolution window is kept, with what was drawn on it, unless its size changes.
     """
-    global window
-    window = pygame.display.set_mode(resolution, mode)
+    global window, _backdrop, _viewport_for
+    screen = pygame.display.set_mode(resolution, mode)
+    if logical_resolution is None:
+        window = screen
+    elif window is None or window is screen or window.get_size() != tuple(logical_resolution):
+        window = pygame.Surface(logical_resolution).convert()
+    _overlays.clear()
+    _backdrop = None
+    _viewport_for = None
+    surfacepool.pool.clear()  # pooled surfaces have the pixel format of the previous display
+    for hook in modeset_hooks:
+        hook()
+
+
+def set_logical_resolution(res) -> None:
+    """
+    Renders everything at a fixed resolution that flip scales to the window in one pass, keeping the aspect ratio.
+    Resizing the window then doesn't lay out rooms again and huge windows don't make room surfaces any bigger.
+    :param res: logical resolution as a Tuple[int, int], or None to render at the window resolution.
+    """
+    global logical_resolution
+    logical_resolution = res
+    if window is not None:
+        modeset()
+        w, h = window.get_size()
+        pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, size=(w, h), w=w, h=h))
 
 
 def set_fullscreen(enable) -> None:
@@ -91,23 +124,10 @@ def set_resolution(res: Tuple[int, int]):
 
 def draw_fps(font=None) -> None:
     """
-    Draws an FPS counter and a spinner.
+    Draws the performance HUD: an FPS counter, a spinner and the profiler overlay. See hud.
     :param font: the font to use to render the counter. There is a default font if not specified.
     """
-    global spinner_angle
-    if not font:
-        font = FPS_FONT
-    screen_w, screen_h = window.get_size()
-    fps = clock.get_fps()
-    fpslabel = font.render('%d FPS' % int(fps), True, c.WHITE, c.BLACK).convert()
-    rec = fpslabel.get_rect(top=5, right=screen_w - 5 - spinner_size[0])
-    window.blit(fpslabel, rec)
-
-    spinner_angle -= math.pi / 4
-    spinner_angle %= math.pi * 2
-    surf = pygame.Surface(spinner_size)
-    pygame.draw.arc(surf, c.WHITE, surf.get_rect(), spinner_angle, spinner_angle + math.pi / 4, 2)
-    window.blit(surf, surf.get_rect(top=5, right=screen_w - 5))
+    hud.draw(window, font or FPS_FONT, clock.get_fps(), clock.get_rawtime(), fps)
 
 
 def tick(_fps=None) -> int:
@@ -122,11 +142,53 @@ def tick(_fps=None) -> int:
 
 def flip() -> None:
     """
-    Equivalent to pygame.display.flip()
+    Equivalent to pygame.display.flip(), but first scales window to the display if there is a logical resolution.
     """
+    global _viewport, _viewport_for
+    if logical_resolution is not None:
+        screen = pygame.display.get_surface()
+        if _viewport_for != screen.get_size():
+            _viewport_for = screen.get_size()
+            _viewport = pygame.Rect((0, 0), utils.resize_keep_ratio(window.get_size(), _viewport_for))
+            _viewport.center = screen.get_rect().center
+            screen.fill(c.BLACK)
+        if _viewport.size == window.get_size():
+            screen.blit(window, _viewport)
+        elif smooth_scaling and screen.get_bitsize() >= 24:
+            pygame.transform.smoothscale(window, _viewport.size, screen.subsurface(_viewport))
+        else:
+            pygame.transform.scale(window, _viewport.size, screen.subsurface(_viewport))
     pygame.display.flip()
 
 
+def to_logical(pos: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Converts a position on the display to a position on window, which differ if there is a logical resolution.
+    """
+    if logical_resolution is None or _viewport is None:
+        return pos
+    w, h = window.get_size()
+    return (int((pos[0] - _viewport.x) * w / _viewport.w), int((pos[1] - _viewport.y) * h / _viewport.h))
+
+
+def map_events(_events) -> None:
+    """
+    Converts the pos of mouse events to window coordinates, in place. See to_logical.
+    """
+    if logical_resolution is None:
+        return
+    for event in _events:
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            event.pos = to_logical(event.pos)
+
+
+def get_mouse_pos() -> Tuple[int, int]:
+    """
+    Same as pygame.mouse.get_pos(), in window coordinates.
+    """
+    return to_logical(pygame.mouse.get_pos())
+
+
 def get_rect(**kwargs) -> pygame.Rect:
     """
     Returns window's rect.
@@ -165,7 +227,39 @@ def darken(alpha) -> None:
     :param alpha: int from 0 to 255 representing how much darker to make the window. 0 means no darkening. 255 means go
     dark abruptly.
     """
-    s = pygame.Surface(window.get_size())
-    s.fill((0, 0, 0))
+    s = overlay(c.BLACK)
     s.set_alpha(alpha)
     window.blit(s, (0, 0))
+
+
+def overlay(color) -> pygame.Surface:
+    """
+    Returns a window sized surface filled with color, allocated only the first time and when the window is resized.
+    It's shared: set its alpha before blitting it, but never draw on it.
+    :param color: the fill color. Its alpha is ignored.
+    """
+    key = tuple(color)[:3]
+    s = _overlays.get(key)
+    if s is None or s.get_size() != window.get_size():
+        s = _overlays[key] = pygame.Surface(window.get_size()).convert()
+        s.fill(key)
+    return s
+
+
+def snapshot(alpha=None, copy=False) -> pygame.Surface:
+    """
+    Copies the window in the backdrop surface and returns it, e.g. as the background of a transition.
+    There is only one backdrop, reused by every snapshot: it's overwritten by the next one.
+    :param alpha: alpha of the whole surface, None for an opaque one.
+    :param copy: if True returns a new surface instead of the backdrop, for who keeps it while others may snapshot.
+    """
+    global _backdrop
+    if copy:
+        surface = pygame.Surface(window.get_size()).convert()
+    else:
+        if _backdrop is None or _backdrop.get_size() != window.get_size():
+            _backdrop = pygame.Surface(window.get_size()).convert()
+        surface = _backdrop
+    surface.blit(window, (0, 0))
+    surface.set_alpha(alpha)
+    return surface
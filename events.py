@@ -2,10 +2,12 @@
 Wrapper of pygame.event with useful functions
 """
 
+import heapq
+import itertools
 import pygame
 import pygame.locals as p
 import logging
-from typing import List, Iterator
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
 
 """
 Events in ALWAYS_ALLOWED are allowed even if you call block_all
@@ -18,38 +20,193 @@ ALWAYS_DISABLED = [p.SYSWMEVENT]
 
 EMPTY_EVENT = pygame.event.Event(p.NOEVENT, {})
 
-available_events = set(range(p.USEREVENT, p.NUMEVENTS))
+PYGAME_EVENTS = range(0x8000, p.USEREVENT)  # pygame's own event types, among which the proxies of SDL event types
+
+_allowed: Union[None, Set[int]] = None  # cache of allowed event types, see get_allowed
+blocking = True  # if False wait never blocks, see headless
 
 __logger = logging.getLogger('EventHandler')
 
 
-def new_timer(time: int):
-    event_type = available_events.pop()
-    pygame.time.set_timer(event_type, time)
-    __logger.debug("New %d ms timer (%d)", time, event_type)
-    return event_type
+class Timers(object):
+    """
+    Heap scheduler for timers, driven by the main loop's dt instead of SDL timers and the event queue.
 
+    Time is a monotonic count of milliseconds advanced by update. Timers are kept in a heap ordered by due time, so
+    adding or cancelling a timer costs O(log n) and an update costs O(expired log n), however many timers are pending.
+    Cancelled timers are dropped lazily when they reach the top of the heap.
+    """
 
-def stop_timer(event_type: int) -> None:
-    pygame.time.set_timer(event_type, 0)
-    available_events.add(event_type)
-    __logger.debug("Timer %d stopped", event_type)
+    def __init__(self):
+        self.now = 0
+        self.heap: List[Tuple[int, int]] = []  # (due time, timer id)
+        self.timers: Dict[int, Tuple[int, Callable]] = {}  # timer id -> (interval, callback); interval is 0 for timeouts
+        self.ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+    def __contains__(self, timer_id: int) -> bool:
+        return timer_id in self.timers
+
+    def add(self, time: int, callback: Callable, repeat: bool = False) -> int:
+        """
+        Schedules callback to be called with the timer id after time milliseconds and, if repeat, every time
+        milliseconds after that.
+        :return: the timer id, to be passed to cancel.
+        """
+        timer_id = next(self.ids)
+        self.timers[timer_id] = (max(1, time) if repeat else 0), callback
+        heapq.heappush(self.heap, (self.now + time, timer_id))
+        return timer_id
+
+    def cancel(self, timer_id: int) -> None:
+        self.timers.pop(timer_id, None)
+
+    def next_due(self) -> Union[None, int]:
+        """
+        :return: milliseconds before the next timer is due (0 if overdue) or None if there are no timers.
+        """
+        heap = self.heap
+        while heap and heap[0][1] not in self.timers:
+            heapq.heappop(heap)
+        return max(0, heap[0][0] - self.now) if heap else None
+
+    def update(self, dt: int) -> int:
+        """
+        Advances time by dt milliseconds and calls the callbacks of expired timers, in due order.
+        An interval timer late by more than its interval is called only once.
+        :return: the number of callbacks called.
+        """
+        self.now += dt
+        heap, timers, now = self.heap, self.timers, self.now
+        fired = 0
+        while heap and heap[0][0] <= now:
+            due, timer_id = heapq.heappop(heap)
+            try:
+                interval, callback = timers[timer_id]
+            except KeyError:
+                continue  # cancelled
+            if interval:
+                due += interval
+                heapq.heappush(heap, (due if due > now else now + interval, timer_id))
+            else:
+                del timers[timer_id]
+            callback(timer_id)
+            fired += 1
+        return fired
+
+
+timers = Timers()
+
+
+def new_timer(time: int, callback: Callable, repeat: bool = False) -> int:
+    timer_id = timers.add(time, callback, repeat)
+    __logger.debug("New %d ms timer (%d)", time, timer_id)
+    return timer_id
+
+
+def stop_timer(timer_id: int) -> None:
+    timers.cancel(timer_id)
+    __logger.debug("Timer %d stopped", timer_id)
+
+
+def update_timers(dt: int) -> int:
+    """
+    Advances the timers by dt milliseconds. See Timers.update.
+    """
+    return timers.update(dt)
 
 
-def get_allowed() -> Iterator[int]:
+def wait() -> pygame.event.Event:
     """
-    Queries pygame and returns the generator of allowed event types.
+    Waits for an event, but not longer than the next timer is due. Returns EMPTY_EVENT on timeout.
+    If blocking is False it returns EMPTY_EVENT straight away when there are no events.
     """
-    blocked = map(pygame.event.get_blocked, range(0, p.NUMEVENTS))
-    return (i for i, v in enumerate(blocked) if not v and i not in ALWAYS_DISABLED)
+    if not blocking:
+        return pygame.event.poll()
+    timeout = timers.next_due()
+    if timeout is None:
+        return pygame.event.wait()
+    if timeout == 0:
+        return EMPTY_EVENT
+    return pygame.event.wait(timeout)
 
 
-def get_blocked() -> Iterator[int]:
+def _query_allowed() -> Set[int]:
     """
-    Queries pygame and returns the set of blocked event types.
+    Queries pygame for the allowed event types. It's slow: one call for every event type up to NUMEVENTS.
     """
     blocked = map(pygame.event.get_blocked, range(0, p.NUMEVENTS))
-    return (i for i, v in enumerate(blocked) if v and i not in ALWAYS_ALLOWED)
+    return {i for i, v in enumerate(blocked) if not v and i not in ALWAYS_DISABLED}
+
+
+def _pygame_set_allowed(event_types: Union[None, Iterable[int]]) -> None:
+    """
+    Calls pygame.event.set_allowed keeping the cache of allowed event types in sync.
+    """
+    global _allowed
+    if event_types is None:
+        pygame.event.set_allowed(None)  # pygame allows every event type
+        _allowed = set(range(0, p.NUMEVENTS)) - set(ALWAYS_DISABLED)
+    else:
+        event_types = set(event_types)
+        pygame.event.set_allowed(list(event_types))
+        _allowed = get_allowed() | (event_types - set(ALWAYS_DISABLED))
+        _sync_pygame_events()
+
+
+def _pygame_set_blocked(event_types: Union[None, Iterable[int]]) -> None:
+    """
+    Calls pygame.event.set_blocked keeping the cache of allowed event types in sync.
+    """
+    global _allowed
+    if event_types is None:
+        pygame.event.set_blocked(None)  # pygame blocks every event type
+        _allowed = set()
+    else:
+        event_types = set(event_types)
+        pygame.event.set_blocked(list(event_types))
+        _allowed = get_allowed() - event_types
+        _sync_pygame_events()
+
+
+def _sync_pygame_events() -> None:
+    """
+    pygame allows and blocks the proxies of SDL event types along with them: queries again the few PYGAME_EVENTS to
+    keep the cache of allowed event types in sync.
+    """
+    global _allowed
+    _allowed = (_allowed - set(PYGAME_EVENTS)) | {i for i in PYGAME_EVENTS if not pygame.event.get_blocked(i)}
+
+
+def get_allowed() -> Set[int]:
+    """
+    Returns the set of allowed event types. Don't modify it: use the functions of this module instead.
+
+    It's cached: pygame is queried only the first time, then the functions of this module keep it in sync.
+    """
+    global _allowed
+    if _allowed is None:
+        _allowed = _query_allowed()
+    return _allowed
+
+
+def get_blocked() -> Set[int]:
+    """
+    Returns the set of blocked event types.
+    """
+    return set(range(0, p.NUMEVENTS)) - get_allowed() - set(ALWAYS_ALLOWED)
+
+
+def peek() -> bool:
+    """
+    Tells whether there are events in the queue, without removing them.
+
+    There is no need to pass the allowed event types to pygame (which would check them one by one): the functions of
+    this module never leave blocked events in the queue.
+    """
+    return bool(pygame.event.peek())
 
 
 def allow_all() -> None:
@@ -57,15 +214,15 @@ def allow_all() -> None:
     Allow all event types.
     """
     # workaround to re-enable all events except SYSWMEVENT
-    pygame.event.set_allowed(list(range(p.NOEVENT, p.NUMEVENTS)) - ALWAYS_DISABLED)
+    _pygame_set_allowed(set(range(p.NOEVENT, p.NUMEVENTS)) - set(ALWAYS_DISABLED))
 
 
 def block_all() -> None:
     """
     All event types are blocked.
     """
-    pygame.event.set_allowed(None)
-    pygame.event.set_allowed(ALWAYS_ALLOWED)
+    _pygame_set_allowed(None)
+    _pygame_set_allowed(ALWAYS_ALLOWED)
 
 
 def post(events) -> None:
@@ -83,63 +240,64 @@ def names(event_types: List[int]) -> List[str]:
     return [pygame.event.event_name(e) for e in event_types]
 
 
-def set_allowed(event_types: List[int]) -> None:
+def set_allowed(event_types: Iterable[int]) -> None:
     """
     event_types must be a list of event types that will be allowed.
     All other event types will be blocked.
     Allowed events that would be discarded by pygame are kept and reposted.
     """
+    event_types = set(event_types) | set(ALWAYS_ALLOWED)
 
-    event_types.extend(ALWAYS_ALLOWED)
-
-    if set(event_types) == get_allowed():
+    if event_types == get_allowed():
         return
 
     discarded_events = pygame.event.get()
 
     block_all()
-    pygame.event.set_allowed(event_types)
+    _pygame_set_allowed(event_types)
 
     post([e for e in discarded_events if e.type in event_types])
 
 
-def set_blocked(event_types: List[int]) -> None:
+def set_blocked(event_types: Iterable[int]) -> None:
     """
     This is the opposite of set_allowed.
     Allowed events that would be discarded by pygame are kept and reposted.
     """
-    event_types -= ALWAYS_ALLOWED
+    event_types = set(event_types) - set(ALWAYS_ALLOWED)
 
-    if set(get_allowed()).isdisjoint(set(event_types)):
+    if get_allowed().isdisjoint(event_types):
         return
 
     discarded_events = pygame.event.get()
 
     allow_all()
     if event_types:
-        pygame.event.set_blocked(event_types)
+        _pygame_set_blocked(event_types)
 
     post([e for e in discarded_events if e.type not in event_types])
 
 
-def add_allowed(event_types: List[int]) -> None:
+def add_allowed(event_types: Iterable[int]) -> None:
     """
     Adds allowed event types without touching the others.
     Allowed events that would be discarded by pygame are kept and reposted.
     """
+    event_types = set(event_types)
     discarded = pygame.event.get()
-    pygame.event.set_allowed(event_types)
-    post([e for e in discarded if e.type in event_types])
+    _pygame_set_allowed(event_types)
+    post([e for e in discarded if e.type in get_allowed()])
 
 
-def add_blocked(event_types: List[int]) -> None:
+def add_blocked(event_types: Iterable[int]) -> None:
     """
     This is the opposite of add_allowed.
     Allowed events that would be discarded by pygame are kept and reposted.
     """
+    event_types = set(event_types)
     discarded = pygame.event.get()
-    pygame.event.set_blocked(event_types)
-    post([e for e in discarded if e.type in event_types])
+    _pygame_set_blocked(event_types)
+    post([e for e in discarded if e.type in get_allowed()])
 
 
 def event_loop(callback, wait=True) -> None:
@@ -150,7 +308,7 @@ def event_loop(callback, wait=True) -> None:
     """
     done = callback([EMPTY_EVENT])
     while not done:
-        if wait and not pygame.event.peek(list(get_allowed())):
+        if wait and not peek():
             events = [pygame.event.wait()]
         else:
             events = pygame.event.get()
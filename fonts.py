@@ -1,25 +1,73 @@
+"""
+Fonts of the game: MAIN_MENU, MAIN, SMALL, SMALLER and MONOSPACE.
+
+They are opened lazily: load_fonts only chooses the faces for the language and each font is opened the first time it's
+used. Every font file is read once and all its sizes are opened from the same bytes in memory.
+"""
+
+import io
+
+from typing import Dict, Tuple
+
+import pygame
+
 import resources
 
 
-MAIN_MENU = None
-MAIN = None
-SMALL = None
-SMALLER = None
-MONOSPACE = None
+NAMES = ('MAIN_MENU', 'MAIN', 'SMALL', 'SMALLER', 'MONOSPACE')
+
+FACES = {  #: language -> font name -> (file, size). Languages not listed use the None entry.
+    None: {
+        'MAIN_MENU': ('Medieval Sharp/MedievalSharp.ttf', 48),
+        'MAIN': ('Medieval Sharp/MedievalSharp.ttf', 36),
+        'SMALL': ('Medieval Sharp/MedievalSharp.ttf', 24),
+        'SMALLER': ('Medieval Sharp/MedievalSharp.ttf', 18),
+        'MONOSPACE': ('LiberationMono/LiberationMono-Regular.ttf', 18),
+    },
+    'ja_JP': {
+        'MAIN_MENU': ('BabelStoneHan.ttf', 48),
+        'MAIN': ('BabelStoneHan.ttf', 36),
+        'SMALL': ('BabelStoneHan.ttf', 24),
+        'SMALLER': ('BabelStoneHan.ttf', 18),
+        'MONOSPACE': ('LiberationMono/LiberationMono-Regular.ttf', 18),
+    },
+}
+
+_faces: Dict[str, Tuple[str, int]] = {}  # font name -> (file, size) for the language chosen by load_fonts
+_files: Dict[str, bytes] = {}  # file -> its content, shared by every size
+_fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
 
 
 def load_fonts(lang):
-    global MAIN_MENU, MAIN, SMALL, SMALLER, MONOSPACE
-    if lang != 'ja_JP':
-        MAIN_MENU = resources.load_font('Medieval Sharp/MedievalSharp.ttf', 48)
-        MAIN = resources.load_font('Medieval Sharp/MedievalSharp.ttf', 36)
-        SMALL = resources.load_font('Medieval Sharp/MedievalSharp.ttf', 24)
-        SMALLER = resources.load_font('Medieval Sharp/MedievalSharp.ttf', 18)
-        MONOSPACE = resources.load_font("LiberationMono/LiberationMono-Regular.ttf", 18)
-    else:
-        MAIN_MENU = resources.load_font('BabelStoneHan.ttf', 48)
-        MAIN = resources.load_font('BabelStoneHan.ttf', 36)
-        SMALL = resources.load_font('BabelStoneHan.ttf', 24)
-        SMALLER = resources.load_font('BabelStoneHan.ttf', 18)
-        MONOSPACE = resources.load_font("LiberationMono/LiberationMono-Regular.ttf", 18)
+    """
+    Chooses the fonts for lang. Nothing is opened until used.
+    """
+    global _faces
+    _faces = FACES.get(lang, FACES[None])
+    for name in NAMES:
+        globals().pop(name, None)  # forget fonts of another language
+
+
+def get_font(file, size) -> pygame.font.Font:
+    """
+    Returns the font in file at size, opening it the first time.
+    """
+    font = _fonts.get((file, size))
+    if font is None:
+        data = _files.get(file)
+        if data is None:
+            data = _files[file] = resources.load_font_bytes(file)
+        font = _fonts[file, size] = pygame.font.Font(io.BytesIO(data), size)
+    return font
+
 
+def __getattr__(name):
+    """
+    Opens MAIN_MENU, MAIN, ... the first time they are used. Then they are plain module attributes.
+    """
+    if name not in NAMES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    if not _faces:
+        return None  # load_fonts was not called yet
+    font = globals()[name] = get_font(*_faces[name])
+    return font
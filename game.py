@@ -22,6 +22,7 @@
 
 import pygame
 import pygame.locals as p
+import asyncio
 import gc
 
 import display
@@ -44,9 +45,7 @@ class NextTurnTransition(gui.Label):
 
     def begin(self):
         super().begin()
-        bg = display.window.copy().convert()
-        bg.set_alpha(100)
-        self.background.image = bg
+        self.background.image = display.snapshot(100, copy=True)  # kept for the whole transition
         pygame.mixer.music.fadeout(1000)
         if isinstance(self.next_team, ai.AI):
             self.next = AITurn()
@@ -100,11 +99,10 @@ class Turn(gui.LinearLayout):
         display.darken(200)
         menu = gui.Menu(menu_entries, f.MAIN, layout=room.Layout(gravity=room.Gravity.CENTER), dismiss_callback=True,
                         clear_screen=None)
-        room.run_room(menu)
+        room.push(menu)
 
     def reset(self, *_):
-        room.run_room(rooms.Fadeout(1000))
-        room.stop()
+        room.push(rooms.Fadeout(1000), lambda _: room.stop())
 
     def end_turn(self, *args):
         s.loaded_map.reset_selection()
@@ -129,10 +127,12 @@ class PlayerTurn(Turn):
             modal = gui.Modal(_("Are you sure you want to end your turn? There are still units that can move."),
                               f.SMALL, layout=room.Layout(gravity=gui.Gravity.CENTER), dismiss_callback=True,
                               clear_screen=None)
-            room.run_room(modal)
-            if modal.answer:
-                super().end_turn()
-                self.set_timeout(100, self.mark_done)
+            room.push(modal, self.end_turn_answered)
+
+    def end_turn_answered(self, modal):
+        if modal.answer:
+            super().end_turn()
+            self.set_timeout(100, self.mark_done)
 
 
 class AITurn(Turn):
@@ -151,13 +151,13 @@ class AITurn(Turn):
                 self.team.end_turn()
 
 
-def main_menu():
-    room.run(rooms.SplashScreen())
-    room.run(rooms.Fadeout(2000))
+async def main_menu():
+    await room.run_async(rooms.SplashScreen())
+    await room.run_async(rooms.Fadeout(2000))
 
 
-def actual_game():
-    room.run(NextTurnTransition(s.units_manager.active_team))
+async def actual_game():
+    await room.run_async(NextTurnTransition(s.units_manager.active_team))
 
     s.loaded_map = None
     s.units_manager = None
@@ -165,12 +165,20 @@ def actual_game():
     gc.collect()
 
 
-def play(map_file):
+async def play_async(map_file):
     if map_file is None:
-        main_menu()
+        await main_menu()
     else:
         s.load_map(map_file)
 
     while True:
-        actual_game()
-        main_menu()
+        await actual_game()
+        await main_menu()
+
+
+def play(map_file):
+    """
+    Plays until the player quits, driving rooms from an asyncio event loop so that they can run tasks, e.g. to load
+    maps (see rooms.LoadingScreen).
+    """
+    asyncio.run(play_async(map_file))
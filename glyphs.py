@@ -0,0 +1,98 @@
+"""
+Glyph atlas text renderer, for text that changes often.
+"""
+
+from typing import Dict, Tuple, Union
+
+import pygame
+
+from atlas import Atlas
+
+
+Color = Union[pygame.Color, Tuple[int, int, int], Tuple[int, int, int, int]]
+
+
+class GlyphAtlas(object):
+    """
+    Renders strings by blitting glyphs from an Atlas, one per (font, color, antialias).
+
+    Every character is rasterized by font.render only the first time it's seen. Glyphs are then placed one after the
+    other using the advances from font.metrics, so a counter going from 99 to 100 costs three blits instead of a
+    render. There is no kerning: text looks like font.render without pair kerning, which is fine for numbers and HUDs.
+    """
+
+    def __init__(self, font: pygame.font.Font, color: Color, antialias: bool = True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.height = font.get_height()
+        self.atlas = Atlas(page_size=(256, 256))
+        self.advances: Dict[str, int] = {}
+        self.sources: Dict[str, Tuple[pygame.Surface, pygame.Rect]] = {}  # char -> (atlas page, rect in the page)
+
+    def _add_glyph(self, char: str) -> int:
+        glyph = self.font.render(char, self.antialias, self.color)
+        self.atlas.add(char, glyph)
+        page, rect = self.atlas.rects[char]
+        self.sources[char] = self.atlas.pages[page], rect
+        metrics = self.font.metrics(char)[0]
+        advance = self.advances[char] = metrics[4] if metrics else glyph.get_width()
+        return advance
+
+    def width(self, text: str) -> int:
+        """
+        :return: the width of text once rendered, in pixels.
+        """
+        advances = self.advances
+        w = 0
+        for char in text:
+            try:
+                w += advances[char]
+            except KeyError:
+                w += self._add_glyph(char)
+        return w
+
+    def size(self, text: str) -> Tuple[int, int]:
+        return self.width(text), self.height
+
+    def blit(self, dest: pygame.Surface, text: str, pos: Tuple[int, int]) -> int:
+        """
+        Draws text on dest at pos.
+        :return: the width of the drawn text.
+        """
+        x, y = pos
+        start = x
+        advances, sources = self.advances, self.sources
+        blits = []
+        for char in text:
+            if char not in advances:
+                self._add_glyph(char)
+            page, rect = sources[char]
+            blits.append((page, (x, y), rect))
+            x += advances[char]
+        dest.blits(blits, False)
+        return x - start
+
+    def render(self, text: str) -> pygame.Surface:
+        """
+        Like font.render: returns a new per pixel alpha surface with text on it.
+        """
+        surface = pygame.Surface(self.size(text), flags=pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        self.blit(surface, text, (0, 0))
+        return surface
+
+
+_atlases: Dict[tuple, GlyphAtlas] = {}
+
+
+def glyph_atlas(font: pygame.font.Font, color: Color, antialias: bool = True) -> GlyphAtlas:
+    """
+    Returns the shared GlyphAtlas of font, color and antialias, creating it the first time.
+    """
+    key = font, tuple(color), antialias
+    try:
+        return _atlases[key]
+    except KeyError:
+        atlas = _atlases[key] = GlyphAtlas(font, color, antialias)
+        return atlas
@@ -1,4 +1,5 @@
 from .common import *
+from .text import TextCache, render_text
 from .bar import *
 from .button import *
 from .container import *
@@ -10,6 +10,12 @@ import colors as c
 
 
 class LifeBar(room.Room):
+    """
+    A bar of blocks, one per point: the first value blocks have the life color, the others the damage color.
+
+    Blocks are blit from two pre-rendered strips, a full row of life blocks and one of damage blocks, clipped at the
+    value boundary. When only the value changes, just the blocks that flipped are drawn again.
+    """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._points = kwargs.get('points', 100)
@@ -21,6 +27,20 @@ class LifeBar(room.Room):
         self._damage = self._life.copy()
         self._life.fill(kwargs.get('life_color', c.GREEN))
         self._damage.fill(kwargs.get('damage_color', c.RED))
+        self._life_strip = self._strip(self._life)
+        self._damage_strip = self._strip(self._damage)
+        self._drawn_value = None  # value currently drawn on self.surface, None if it must be drawn from scratch
+
+    def _strip(self, block):
+        """
+        Renders a full row of blocks, with transparent spacing.
+        """
+        stride = self.block_size[0] + self.spacing[0]
+        strip = pygame.Surface((self.blocks_per_row * stride, self.block_size[1]), flags=pygame.SRCALPHA)
+        strip.fill((0, 0, 0, 0))
+        for i in range(self.blocks_per_row):
+            strip.blit(block, (i * stride, 0))
+        return strip
 
     @property
     def value(self):
@@ -38,6 +58,7 @@ class LifeBar(room.Room):
     @points.setter
     def points(self, _points):
         self._points = _points
+        self._drawn_value = None
         self.invalidate()
         self.layout_request()
 
@@ -46,15 +67,37 @@ class LifeBar(room.Room):
         h = (((self.points - 1) // self.blocks_per_row) + 1) * (self.block_size[1] + self.spacing[1])
         self.resolve_measure(spec_width, spec_height, w, h)
 
+    def fill(self, area=None):
+        super().fill(area)
+        self._drawn_value = None
+
+    def _draw_blocks(self, start, end, value):
+        """
+        Draws blocks from start (included) to end (excluded) with one blit per row and strip.
+        """
+        stride_x = self.block_size[0] + self.spacing[0]
+        stride_y = self.block_size[1] + self.spacing[1]
+        h = self.block_size[1]
+        i = start
+        while i < end:
+            row = i // self.blocks_per_row
+            row_end = min(end, (row + 1) * self.blocks_per_row)
+            for strip, first, last in ((self._life_strip, i, min(row_end, value)),
+                                       (self._damage_strip, max(i, value), row_end)):
+                if first < last:
+                    col = first - row * self.blocks_per_row
+                    area = pygame.Rect(col * stride_x, 0, (last - first) * stride_x, h)
+                    self.surface.blit(strip, (area.x, row * stride_y), area)
+            i = row_end
+
     def draw(self):
-        self.surface.fill((0, 0, 0, 0))
-        for i in range(self.points):
-            x = (i % self.blocks_per_row) * (self.block_size[0] + self.spacing[0])
-            y = (i // self.blocks_per_row) * (self.block_size[1] + self.spacing[1])
-            if i < self._value % (self.points + 1):
-                self.surface.blit(self._life, (x, y))
-            else:
-                self.surface.blit(self._damage, (x, y))
+        value = self._value % (self.points + 1)
+        if self._drawn_value is None:
+            self.surface.fill((0, 0, 0, 0))
+            self._draw_blocks(0, self.points, value)
+        elif value != self._drawn_value:
+            self._draw_blocks(min(value, self._drawn_value), max(value, self._drawn_value), value)
+        self._drawn_value = value
 
 
 if __name__ == "__main__":
@@ -8,6 +8,8 @@ import pygame
 import room
 import colors as c
 
+from .text import render_text
+
 
 class Button(room.Room):
     def __init__(self, text, font, **kwargs):
@@ -22,8 +24,8 @@ class Button(room.Room):
 
     def set_text(self, text):
         self.text = text
-        self.rendered_text = self.font.render(text, True, self.txt_color,
-                                              self.sel_color if self._focus else self.background.color)
+        self.rendered_text = render_text(self.font, text, self.txt_color,
+                                         self.sel_color if self._focus else self.background.color)
         self.layout_request()
 
     def measure(self, spec_width, spec_height):
@@ -40,13 +42,13 @@ class Button(room.Room):
 
     def focus(self):
         if not self._focus:
-            self.rendered_text = self.font.render(self.text, True, self.txt_color, self.sel_color)
+            self.rendered_text = render_text(self.font, self.text, self.txt_color, self.sel_color)
             self._focus = True
             self.invalidate()
 
     def unfocus(self):
         if self._focus:
-            self.rendered_text = self.font.render(self.text, True, self.txt_color, self.background.color)
+            self.rendered_text = render_text(self.font, self.text, self.txt_color, self.background.color)
             self._focus = False
             self.invalidate()
 
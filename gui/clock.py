@@ -5,12 +5,11 @@ Simple widget that displays elapsed time.
 from datetime import timedelta
 
 import gui
-import events
 
 
 class Clock(gui.Label):
     def __init__(self, font, **kwargs):
-        super().__init__("0", font, **kwargs)
+        super().__init__("0", font, glyphs=True, **kwargs)
         self.time = 0
         self.timeout = None
         self.playing = kwargs.get('playing', True)
@@ -18,7 +17,11 @@ class Clock(gui.Label):
     def begin(self):
         super().begin()
         if not self.timeout:
-            self.timeout = events.new_timer(100)  # generate an event every 100ms
+            self.timeout = self.set_interval(100, lambda *_: None)  # wake up the main loop every 100ms
+
+    def end(self):
+        super().end()
+        self.timeout = None
 
     def reset(self):
         self.time = 0
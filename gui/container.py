@@ -44,18 +44,19 @@ class LinearLayout(room.Room):
 
         for child in self.children:
             if child.layout.height == LayoutParams.WRAP_CONTENT:
-                child.measure(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.AT_MOST, h))
+                child.measure_if_needed(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.AT_MOST, h))
                 h -= child.measured_height
             elif child.layout.height == LayoutParams.FILL_PARENT:
                 fill_parent_children.append(child)
             else:
                 child_height = min(h, child.layout.height)
-                child.measure(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.EXACTLY, child_height))
+                child.measure_if_needed(MeasureParams(MeasureSpec.AT_MOST, w),
+                                        MeasureParams(MeasureSpec.EXACTLY, child_height))
                 h -= child_height
         if fill_parent_children:
             h //= len(fill_parent_children)
             for child in fill_parent_children:
-                child.measure(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.EXACTLY, h))
+                child.measure_if_needed(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.EXACTLY, h))
         for child in self.children:
             width_children = max(width_children, child.measured_width + self.padding.we)
             height_children += child.measured_height
@@ -72,18 +73,19 @@ class LinearLayout(room.Room):
 
         for child in self.children:
             if child.layout.width == LayoutParams.WRAP_CONTENT:
-                child.measure(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.AT_MOST, h))
+                child.measure_if_needed(MeasureParams(MeasureSpec.AT_MOST, w), MeasureParams(MeasureSpec.AT_MOST, h))
                 w -= child.measured_width
             elif child.layout.width == LayoutParams.FILL_PARENT:
                 fill_parent_children.append(child)
             else:
                 child_w = min(w, child.layout.width)
-                child.measure(MeasureParams(MeasureSpec.EXACTLY, child_w), MeasureParams(MeasureSpec.AT_MOST, h))
+                child.measure_if_needed(MeasureParams(MeasureSpec.EXACTLY, child_w),
+                                        MeasureParams(MeasureSpec.AT_MOST, h))
                 w -= child_w
         if fill_parent_children:
             w //= len(fill_parent_children)
             for child in fill_parent_children:
-                child.measure(MeasureParams(MeasureSpec.EXACTLY, w), MeasureParams(MeasureSpec.AT_MOST, h))
+                child.measure_if_needed(MeasureParams(MeasureSpec.EXACTLY, w), MeasureParams(MeasureSpec.AT_MOST, h))
         for child in self.children:
             width_children += child.measured_width
             height_children = max(height_children, child.measured_height + self.padding.ns)
@@ -165,6 +167,6 @@ class LinearLayout(room.Room):
             if (child.rect.w > child_rect.w or child.rect.h > child_rect.h
                     or child.rect.topleft != child_rect.topleft):
                 self.fill(child.rect)
-            child.layout_children(child_rect)
+            child.layout_if_needed(child_rect)
 
         self.resolve_layout(rect)
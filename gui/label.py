@@ -9,6 +9,10 @@ import room
 
 import colors as c
 
+from glyphs import glyph_atlas
+
+from .text import render_text
+
 
 class Label(room.Room):
     def __init__(self, format_string, font, **kwargs):
@@ -18,25 +22,51 @@ class Label(room.Room):
         self.tabs = kwargs.get('tabs', 100)
         self.txt_color = kwargs.get('txt_color', c.WHITE)
         #self.align = kwargs.get('align', 'center')
+        self.glyphs = kwargs.get('glyphs', False)  # draw with a GlyphAtlas instead of font.render
+        self._atlas = None
         self.text = self.format_string = format_string
+        self.text_surface = None
         self._render_text()
 
     def _render_text(self):
         lines = map(lambda x: x.split('\t'), self.text.split('\n'))
-        self.rendered_text = [ [self.font.render(t, True, self.txt_color) for t in r] for r in lines ]
-
-    def draw(self):
-        self.fill()
-        text_surf = pygame.Surface(self.text_area(), flags=pygame.SRCALPHA)
+        if self.glyphs:
+            # segments stay strings: _compose draws them straight from the atlas
+            self._atlas = glyph_atlas(self.font, self.txt_color)
+            self.rendered_text = list(lines)
+        else:
+            self.rendered_text = [ [render_text(self.font, t, self.txt_color) for t in r] for r in lines ]
+        self._compose()
+
+    def _segment_width(self, segment):
+        if self.glyphs:
+            return self._atlas.width(segment)
+        return segment.get_width()
+
+    def _compose(self):
+        """
+        Composites the rendered lines on self.text_surface, which is reused as long as its size doesn't change.
+        """
+        size = self.text_area()
+        if self.text_surface is None or self.text_surface.get_size() != size:
+            self.text_surface = pygame.Surface(size, flags=pygame.SRCALPHA)
+        else:
+            self.text_surface.fill((0, 0, 0, 0))
         y = 0
-        for i, line in enumerate(self.rendered_text):
+        for line in self.rendered_text:
             x = 0
             for tab in line:
-                text_surf.blit(tab, (x, y))
-                x += self.tab_space(tab.get_width())
+                if self.glyphs:
+                    self._atlas.blit(self.text_surface, tab, (x, y))
+                else:
+                    self.text_surface.blit(tab, (x, y))
+                x += self.tab_space(self._segment_width(tab))
             y += self.font.get_linesize() + self.leading
-        pos_rect = text_surf.get_rect(centerx=self.rect.w//2, centery=self.rect.h//2)
-        self.surface.blit(text_surf, pos_rect)
+
+    def draw(self):
+        self.fill()
+        pos_rect = self.text_surface.get_rect(centerx=self.rect.w//2, centery=self.rect.h//2)
+        self.surface.blit(self.text_surface, pos_rect)
         self.draw_children()
         self.valid = True
 
@@ -58,10 +88,10 @@ class Label(room.Room):
 
     def line_width(self, line):
         if len(line) == 1:
-            return line[0].get_width()
+            return self._segment_width(line[0])
         line_w = 0
         for tab in line:
-            line_w += self.tab_space(tab.get_width())
+            line_w += self.tab_space(self._segment_width(tab))
         return line_w
 
     def text_area(self):
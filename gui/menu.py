@@ -11,8 +11,16 @@ import room
 import colors as c
 from basictypes import Point
 
+from .text import render_text
+
 
 class Menu(room.Room):
+    """
+    A list of entries, (text, callback) pairs, to choose from with mouse or keyboard.
+
+    The normal and highlighted surfaces of every entry are kept, and when the selection moves only the two entries
+    involved are drawn again.
+    """
     K_INDEX_INCREASE = p.K_DOWN
     K_INDEX_DECREASE = p.K_UP
 
@@ -48,10 +56,42 @@ class Menu(room.Room):
     @menu_entries.setter
     def menu_entries(self, entries):
         self._menu_entries = entries
-        self.rendered_entries = [self.font.render(entry[0], True, self.txt_color).convert_alpha() for entry in entries]
+        self.rendered_entries = [render_text(self.font, entry[0], self.txt_color) for entry in entries]
+        self._normal_entries = [None] * len(entries)
+        self._selected_entries = [None] * len(entries)
+        self._dirty_entries = None
         self.layout_request()
         self.prev_index = self.index = None
 
+    def entry_surface(self, i, selected):
+        """
+        Returns the surface of entry i, highlighted or not, rendering it only the first time.
+        """
+        surfaces = self._selected_entries if selected else self._normal_entries
+        surface = surfaces[i]
+        if surface is None:
+            color = self.sel_color if selected else self.background.color
+            surface = surfaces[i] = render_text(self.font, self.menu_entries[i][0], self.txt_color, color)
+        return surface
+
+    def invalidate(self):
+        super().invalidate()
+        self._dirty_entries = None  # everything must be drawn again
+
+    def invalidate_entry(self, i):
+        """
+        Like invalidate, but only entry i will be drawn again.
+        """
+        dirty = self._dirty_entries
+        room.Room.invalidate(self)
+        if dirty is not None:
+            dirty.add(i)
+            self._dirty_entries = dirty
+
+    def fill(self, area=None):
+        super().fill(area)
+        self._dirty_entries = None
+
     def dismiss(self):
         if self.dismiss_callback:
             self.choice = None
@@ -80,10 +120,8 @@ class Menu(room.Room):
     def set_index(self, index):
         if index is None:
             if self.index is not None:
-                txt = self.menu_entries[self.index][0]
-                r = self.font.render(txt, True, self.txt_color, self.background.color).convert_alpha()
-                self.rendered_entries[self.index] = r
-                self.invalidate()
+                self.rendered_entries[self.index] = self.entry_surface(self.index, False)
+                self.invalidate_entry(self.index)
             self.prev_index = self.index
             self.index = None
             return
@@ -92,15 +130,11 @@ class Menu(room.Room):
         self.index = index % len(self.menu_entries)
 
         if self.index != self.prev_index:
-            for i, entry in enumerate(self.menu_entries):
-                entry_text, entry_callback = entry
-                if i == self.index:
-                    render = self.font.render(entry_text, True, self.txt_color, self.sel_color).convert_alpha()
-                    self.rendered_entries[i] = render
-                elif i == self.prev_index:
-                    render = self.font.render(entry_text, True, self.txt_color, self.background.color).convert_alpha()
-                    self.rendered_entries[i] = render
-            self.invalidate()
+            self.rendered_entries[self.index] = self.entry_surface(self.index, True)
+            self.invalidate_entry(self.index)
+            if self.prev_index is not None:
+                self.rendered_entries[self.prev_index] = self.entry_surface(self.prev_index, False)
+                self.invalidate_entry(self.prev_index)
 
     def move_index(self, amount):
         if self.index is None:
@@ -109,9 +143,14 @@ class Menu(room.Room):
             self.set_index(self.index + amount)
 
     def get_entry_pos(self, i):
+        return self.global_coord(self.entry_pos(i))
+
+    def entry_pos(self, i):
+        """
+        Returns the position of entry i on self.surface.
+        """
         line_height = self.font.get_linesize() + self.leading
-        return self.global_coord(Point(self.padding[3],
-                                       self.padding[0] + i * line_height))
+        return Point(self.padding[3], self.padding[0] + i * line_height)
 
     def handle_mousebuttondown(self, event):
         if event.button == 1:
@@ -136,12 +175,26 @@ class Menu(room.Room):
             self.set_index(None)
 
     def draw(self):
-        self.fill()
+        dirty = self._dirty_entries
+        # entries can be drawn alone only over a plain opaque color
+        plain = not (self.children or self.background.transparent or self.background.image)
+        if dirty is None or not plain:
+            self.fill()
+            self.draw_entries()
+            self.draw_children()
+        else:
+            for i in dirty:
+                entry = self.rendered_entries[i]
+                area = pygame.Rect(self.entry_pos(i), entry.get_size())
+                self.background.fill(self.surface, area)
+                self.surface.blit(entry, area)
+        self._dirty_entries = set()
+        self.valid = True
+
+    def draw_entries(self):
         linesize = self.font.get_linesize()
         for i, entry in enumerate(self.rendered_entries):
             self.surface.blit(entry, (self.padding[3], i * (linesize + self.leading) + self.padding[0]))
-        self.draw_children()
-        self.valid = True
 
 
 class HorizontalMenu(Menu):
@@ -158,17 +211,14 @@ class HorizontalMenu(Menu):
         h = self.font.get_linesize()
         self.resolve_measure(spec_width, spec_height, w, h)
 
-    def get_entry_pos(self, index):
+    def entry_pos(self, index):
         x = self.padding.w
         for i in range(index):
             x += self.rendered_entries[i].get_width() + self.leading
-        return self.global_coord(Point(x, self.padding[0]))
+        return Point(x, self.padding[0])
 
-    def draw(self):
-        self.fill()
+    def draw_entries(self):
         x = self.padding[3]
         for i, entry in enumerate(self.rendered_entries):
             self.surface.blit(entry, (x, self.padding[0]))
             x += entry.get_width() + self.leading
-        self.draw_children()
-        self.valid = True
@@ -4,6 +4,7 @@
 
 
 import pygame
+import collections
 import itertools
 import math
 
@@ -11,6 +12,7 @@ from typing import Tuple, List
 
 import gui
 import room
+import utils
 import colors as c
 
 from room import BackgroundSize
@@ -19,7 +21,12 @@ from room import BackgroundSize
 class NinePatch(room.Background):
     """
     This class implements a simple NinePatch texture.
+
+    Opaque surfaces are filled from a cached rendering of the whole background, done once per size: partial fills
+    just copy the requested area from it. The last MAX_CACHED_SIZES sizes are kept.
     """
+    MAX_CACHED_SIZES = 2
+
     def __init__(self, patch: pygame.Surface, corners_size: Tuple[int, int], color=c.MENU_BG, image=None,
                  size=BackgroundSize.CONTAIN):
         """
@@ -36,6 +43,7 @@ class NinePatch(room.Background):
         # slice the image in 9 parts
         rects = self.ninepatch_rects(patch.get_size())
         self.nine = [pygame.Surface.subsurface(patch, rect) for rect in rects]
+        self._rendered: 'collections.OrderedDict[tuple, pygame.Surface]' = collections.OrderedDict()
 
     def ninepatch_rects(self, area: Tuple[int, int]) -> List[pygame.Rect]:
         """
@@ -60,6 +68,35 @@ class NinePatch(room.Background):
         return [pygame.Rect(pos, size) for pos, size in zip(positions, sizes)]
 
     def fill(self, surface: pygame.Surface, area: pygame.Rect) -> None:
+        if surface.get_flags() & pygame.SRCALPHA:
+            # copying would replace the alpha of surface instead of blending on it
+            self.draw_patches(surface, area)
+        elif area:
+            surface.blit(self.rendered(surface.get_size()), area, area)
+        else:
+            surface.blit(self.rendered(surface.get_size()), (0, 0))
+
+    def rendered(self, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Returns the whole background rendered at size, rendering it only the first time.
+        """
+        key = size, self.color and tuple(self.color), id(self.image), self.size
+        try:
+            self._rendered.move_to_end(key)
+            return self._rendered[key]
+        except KeyError:
+            pass
+        surface = utils.convert(pygame.Surface(size))
+        self.draw_patches(surface, None)
+        self._rendered[key] = surface
+        if len(self._rendered) > self.MAX_CACHED_SIZES:
+            self._rendered.popitem(last=False)
+        return surface
+
+    def draw_patches(self, surface: pygame.Surface, area: pygame.Rect) -> None:
+        """
+        Draws the background straight on surface, tiling the patches.
+        """
         super().fill(surface, area)
         rects = self.ninepatch_rects(surface.get_size())
         for i, (nine, rect) in enumerate(zip(self.nine, rects)):
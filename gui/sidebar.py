@@ -24,7 +24,7 @@ class Sidebar(gui.LinearLayout):
         self.turn_label = gui.Label(_("{team} turn"), font)
         self.terrain_label = gui.Label(f'Terrain: {{0}}\n{_("Def")}: {{1}}\n{_("Avoid")}: {{2}}\n{_("Allowed")}: {{3}}', font)
         self.unit_label = gui.Label('Unit: {0}\nHealth: {1}\nCan move on: {2}\nWeapon: {3}', font)
-        self.coord_label = gui.Label('X: {0} Y: {1}', font, layout=Layout(gravity=Gravity.BOTTOM))
+        self.coord_label = gui.Label('X: {0} Y: {1}', font, layout=Layout(gravity=Gravity.BOTTOM), glyphs=True)
         self.clock = gui.Clock(font, layout=Layout(gravity=Gravity.BOTTOM))
 
         self.add_children(self.turn_label, self.terrain_label, self.unit_label, self.coord_label, self.clock)
@@ -0,0 +1,66 @@
+"""
+Shared cache of rendered text.
+"""
+
+import collections
+
+from typing import Tuple, Union
+
+import pygame
+
+import utils
+
+
+Color = Union[pygame.Color, Tuple[int, int, int], Tuple[int, int, int, int]]
+
+
+class TextCache(object):
+    """
+    Least recently used cache of font.render results, keyed by font, text, colors and antialiasing.
+
+    The same strings are rendered over and over (menu entries, unit stats, the digits of a clock), so most renders are
+    lookups. Cached surfaces are shared: blit them, never draw on them.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.surfaces: 'collections.OrderedDict[tuple, pygame.Surface]' = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+    def render(self, font: pygame.font.Font, text: str, color: Color, background: Color = None,
+               antialias: bool = True) -> pygame.Surface:
+        """
+        Same as font.render(text, antialias, color, background), but cached. The result is converted to the display
+        format if there is a display.
+        """
+        key = font, text, antialias, tuple(color), background and tuple(background)
+        surfaces = self.surfaces
+        try:
+            surface = surfaces[key]
+        except KeyError:
+            self.misses += 1
+            surface = utils.convert(font.render(text, antialias, color, background))
+            surfaces[key] = surface
+            if len(surfaces) > self.max_size:
+                surfaces.popitem(last=False)
+            return surface
+        self.hits += 1
+        surfaces.move_to_end(key)
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+
+
+cache = TextCache()
+
+
+def render_text(font: pygame.font.Font, text: str, color: Color, background: Color = None,
+                antialias: bool = True) -> pygame.Surface:
+    """
+    Renders text with the shared cache. See TextCache.render.
+    """
+    return cache.render(font, text, color, background, antialias)
@@ -6,10 +6,16 @@
 import pygame
 import math
 
+import room
+import utils
+
 from basictypes import Point
 from .container import LinearLayout
 
 
+EASING_SAMPLES = 1024  #: samples of the easing lookup tables, linearly interpolated in between
+
+
 def linear(t, initial, change, duration):
     return initial + change * t / duration
 
@@ -186,11 +192,92 @@ def out_in_bounce(t, initial, change, duration):
 
 
 easing_functions = [linear] + [f for name, f in locals().items() if name.startswith('in') or name.startswith('out')]
+_tabled = frozenset(easing_functions)
+
+_easing_tables = {}
+
+
+def easing_table(easing):
+    """
+    Returns the lookup table of one of easing_functions: EASING_SAMPLES + 1 samples of its progress from 0 to 1.
+
+    Every easing function is initial + change * progress(t / duration), so the same table serves every tween.
+    """
+    table = _easing_tables.get(easing)
+    if table is None:
+        table = _easing_tables[easing] = [easing(i, 0, 1, EASING_SAMPLES) for i in range(EASING_SAMPLES + 1)]
+    return table
+
+
+def progress(easing, t, duration):
+    """
+    Returns easing(t, 0, 1, duration) for 0 <= t <= duration, looked up in its table if it's one of easing_functions.
+    """
+    table = _easing_tables.get(easing)
+    if table is None:
+        if easing is linear or easing not in _tabled:
+            return easing(t, 0, 1, duration)
+        table = easing_table(easing)
+    x = t * EASING_SAMPLES / duration
+    i = int(x)
+    if i >= EASING_SAMPLES:
+        return table[EASING_SAMPLES]
+    return table[i] + (table[i + 1] - table[i]) * (x - i)
+
+
+class TweenManager(object):
+    """
+    Advances all the playing tweens of the scene on top in one pass after each of its loops.
+
+    Every tween computes its progress once for both axes from the easing lookup tables, and the areas the tweens left
+    are merged per parent before being filled, so that many tweens moving together cost one fill per overlapping area.
+    """
+
+    def __init__(self):
+        self.tweens = []
+
+    def add(self, tween):
+        if tween not in self.tweens:
+            self.tweens.append(tween)
+
+    def remove(self, tween):
+        if tween in self.tweens:
+            self.tweens.remove(tween)
+
+    def advance(self, scene, dt):
+        """
+        Moves the playing tweens whose root is scene and advances their clocks by dt. Hooked to room.loop_hooks.
+
+        Tweens are placed room.interpolation of a step ahead of their clock, where they will be when the frame is drawn.
+        """
+        dirty = {}
+        for tween in list(self.tweens):
+            if not tween.playing or tween.parent is None:
+                continue
+            node = tween
+            while node.parent:
+                node = node.parent
+            if node is not scene:
+                continue
+            left, top = tween.rect.topleft
+            if tween.move(room.interpolation * room.SIM_STEP) and tween.rect.w and tween.rect.h:
+                dirty.setdefault(tween.parent, []).append(pygame.Rect(left, top, tween.rect.w, tween.rect.h))
+            tween.clock = tween.clock - dt if tween.backward else tween.clock + dt
+        for parent, areas in dirty.items():
+            parent.invalidate()
+            for area in utils.merge_rects(areas):
+                parent.fill(area=area)
+
+
+manager = TweenManager()
+room.loop_hooks.append(manager.advance)
 
 
 class Tween(LinearLayout):
     """
-    
+    Moves its children by change in duration milliseconds following an easing function, while playing.
+
+    Playing tweens are advanced by the TweenManager after every loop of their scene.
     """
     def __init__(self, change, duration, **kwargs):
         super().__init__(wait=False, **kwargs)
@@ -231,29 +318,40 @@ class Tween(LinearLayout):
         if reset:
             self.reset()
 
+    def begin(self):
+        super().begin()
+        manager.add(self)
+
+    def end(self):
+        manager.remove(self)
+        super().end()
+
     def reposition(self):
-        prev_rect = self.rect.copy()
+        prev_rect = pygame.Rect(self.rect)
+        if self.move() and prev_rect:  # an empty area would fill the whole parent
+            self.parent.invalidate()
+            self.parent.fill(area=prev_rect)
+
+    def move(self, ahead=0):
+        """
+        Moves self.rect where it must be at self.clock.
+        :param ahead: milliseconds to look ahead of self.clock while the tween is running, to draw in between steps.
+        :return: True if it actually moved, in which case the parent must fill the area left behind.
+        """
+        prev_left, prev_top = self.rect.topleft
         if self.clock <= 0:
             self.done = self.backward
             self.rect.topleft = self.initial
             if self.done and callable(self.callback):
                 self.callback(self)
         elif self.clock < self.duration:
-            self.rect.left = int(self.easing(self.clock, self.initial[0], self.change[0], self.duration))
-            self.rect.top = int(self.easing(self.clock, self.initial[1], self.change[1], self.duration))
-            #self.rect.topleft = self.easing(self.clock, self.initial, self.change, self.duration)
+            clock = self.clock - ahead if self.backward else self.clock + ahead
+            done = progress(self.easing, min(max(clock, 0), self.duration), self.duration)
+            self.rect.topleft = (int(self.initial[0] + self.change[0] * done),
+                                 int(self.initial[1] + self.change[1] * done))
         else:
             self.done = not self.backward
             self.rect.topleft = self.target
             if self.done and callable(self.callback):
                 self.callback(self)
-        if prev_rect.topleft != self.rect.topleft:
-            self.parent.invalidate()
-            self.parent.fill(area=prev_rect)
-
-    def loop(self, _events, dt):
-        super().loop(_events, dt)
-        if not self.playing:
-            return
-        self.reposition()
-        self.clock = self.clock - dt if self.backward else self.clock + dt
+        return (prev_left, prev_top) != self.rect.topleft
@@ -0,0 +1,207 @@
+"""
+Headless deterministic run mode.
+
+Runs rooms without a window, a sound card or a player: SDL uses its dummy video and audio drivers, display.clock is
+replaced by a VirtualClock that advances by a fixed step without ever sleeping, and input comes from a script of
+timestamped events. Virtual time only depends on the number of frames, so runs are reproducible and go as fast as the
+CPU allows, while the real time taken by every frame is collected.
+
+    import headless
+    headless.initialize()
+    ... load a map ...
+    stats = headless.run(game.PlayerTurn(), script=headless.keys(500, [pygame.K_RIGHT] * 10), max_frames=600)
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import random
+import statistics
+import time
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import pygame
+import pygame.locals as p
+
+import display
+import events
+import room
+
+
+ScriptEntry = Tuple[int, pygame.event.Event]  #: (virtual time in milliseconds, event to post at that time)
+
+_logger = logging.getLogger('Headless')
+
+
+class VirtualClock(object):
+    """
+    Drop-in replacement of pygame.time.Clock that never sleeps.
+
+    Every tick advances virtual time by step milliseconds (by default 1000 / framerate), posts the scripted events that
+    became due and measures the real time elapsed since the previous tick. When max_frames ticks have been done it
+    raises room.RoomStop, stopping room.run_async.
+    """
+
+    def __init__(self, step: int = None, script: Iterable[ScriptEntry] = (), max_frames: int = None):
+        """
+        :param step: milliseconds per frame. If None it follows the framerate passed to tick.
+        :param script: events to post, as (virtual time, event) pairs. They need not be sorted.
+        :param max_frames: number of frames after which to stop. If None it never stops.
+        """
+        self.step = step
+        self.max_frames = max_frames
+        self.script: List[ScriptEntry] = sorted(script, key=lambda entry: entry[0])
+        self.times = [entry[0] for entry in self.script]
+        self.posted = 0  # index of the next scripted event
+        self.now = 0
+        self.frames = 0
+        self.dt = 0
+        self.frame_times: List[int] = []  # real nanoseconds taken by every frame
+        self._last = time.perf_counter_ns()
+
+    def tick(self, framerate: int = 0) -> int:
+        """
+        Ends a frame.
+        :param framerate: target fps, used to compute the step if it wasn't given.
+        :return: the virtual milliseconds elapsed since the last tick.
+        """
+        now = time.perf_counter_ns()
+        self.frame_times.append(now - self._last)
+        self._last = now
+        self.frames += 1
+        if self.max_frames is not None and self.frames > self.max_frames:
+            raise room.RoomStop()
+        self.dt = self.step or 1000 // (framerate or display.fps)
+        self.now += self.dt
+        due = bisect.bisect_right(self.times, self.now)
+        for _, event in self.script[self.posted:due]:
+            pygame.event.post(event)
+        self.posted = max(self.posted, due)
+        return self.dt
+
+    def get_time(self) -> int:
+        return self.dt
+
+    def get_rawtime(self) -> int:
+        return self.dt
+
+    def get_fps(self) -> float:
+        """
+        :return: the virtual fps, so that what is drawn doesn't depend on how fast the CPU is.
+        """
+        return 1000 / self.dt if self.dt else 0.0
+
+    def script_over(self) -> bool:
+        return self.posted >= len(self.script)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: frame count and real frame times in milliseconds (mean, median, 95th percentile, max, total) along with
+        the resulting fps.
+        """
+        # the first sample is the time before the first frame, not a frame
+        times = sorted(t / 1e6 for t in self.frame_times[1:]) or [0.0]
+        total = sum(times)
+        return {
+            'frames': len(self.frame_times) - 1,
+            'virtual_ms': self.now,
+            'total_ms': total,
+            'mean_ms': statistics.mean(times),
+            'median_ms': statistics.median(times),
+            'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))],
+            'max_ms': times[-1],
+            'fps': (len(times) * 1000 / total) if total else 0.0,
+        }
+
+
+def initialize(seed: int = 0) -> None:
+    """
+    Initializes pygame with the dummy drivers and the display module with a VirtualClock. Must be called instead of
+    display.initialize.
+    :param seed: seed of the random module, so that battles and AI play the same way on every run.
+    """
+    if pygame.get_init():
+        _logger.warning("pygame was already initialized: the dummy drivers may not be in use")
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    os.environ.setdefault('LANG', 'en_US')
+    random.seed(seed)
+    display.initialize()
+    display.clock = VirtualClock()
+    events.blocking = False
+
+
+def run(first_room: room.Room, script: Iterable[ScriptEntry] = (), max_frames: int = None,
+        step: int = None) -> Dict[str, float]:
+    """
+    Runs first_room, and the rooms it leads to, with a new VirtualClock.
+    :param first_room: the room to run, see room.run_async.
+    :param script: events to post, see VirtualClock.
+    :param max_frames: number of frames after which to stop. If None it runs until the rooms are over.
+    :param step: milliseconds per frame, see VirtualClock.
+    :return: frame time stats, see VirtualClock.stats.
+    """
+    clock = display.clock = VirtualClock(step, script, max_frames)
+    asyncio.run(room.run_async(first_room))
+    stats = clock.stats()
+    _logger.info("%d frames (%d virtual ms) in %.1f ms: %.1f fps, mean %.2f ms, p95 %.2f ms, max %.2f ms",
+                 stats['frames'], stats['virtual_ms'], stats['total_ms'], stats['fps'], stats['mean_ms'],
+                 stats['p95_ms'], stats['max_ms'])
+    return stats
+
+
+def keys(start: int, keys: Sequence[int], interval: int = 100) -> List[ScriptEntry]:
+    """
+    Scripts key presses.
+    :param start: virtual time of the first press.
+    :param keys: keys to press, one after the other.
+    :param interval: milliseconds between presses.
+    :return: KEYDOWN and KEYUP events.
+    """
+    script = []
+    for i, key in enumerate(keys):
+        t = start + i * interval
+        script.append((t, pygame.event.Event(p.KEYDOWN, key=key, mod=0, unicode='', scancode=0)))
+        script.append((t + interval // 2, pygame.event.Event(p.KEYUP, key=key, mod=0, unicode='', scancode=0)))
+    return script
+
+
+def click(t: int, pos: Tuple[int, int], button: int = 1) -> List[ScriptEntry]:
+    """
+    Scripts a mouse click at pos.
+    """
+    return [
+        (t, pygame.event.Event(p.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))),
+        (t, pygame.event.Event(p.MOUSEBUTTONDOWN, pos=pos, button=button)),
+        (t + 50, pygame.event.Event(p.MOUSEBUTTONUP, pos=pos, button=button)),
+    ]
+
+
+if __name__ == '__main__':
+    import argparse
+    import gettext
+
+    import resources
+
+    gettext.install('ice-emblem', resources.LOCALE_PATH)
+    parser = argparse.ArgumentParser(description="Plays a scripted map turn without a window and prints frame times")
+    parser.add_argument('-m', '--map', default='default.tmx', help="which map to load")
+    parser.add_argument('-f', '--frames', default=600, type=int, help="number of frames to run")
+    parser.add_argument('-s', '--seed', default=0, type=int, help="random seed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    initialize(args.seed)
+
+    import game
+    import state as s
+
+    s.load_map(resources.map_path(args.map))
+    moves = [p.K_RIGHT, p.K_DOWN, p.K_LEFT, p.K_UP]
+    random.seed(args.seed)
+    script = keys(2500, [random.choice(moves) for _ in range(args.frames // 6)])  # after the turn transition
+    result = run(game.NextTurnTransition(s.units_manager.active_team), script, args.frames)
+    for k, v in result.items():
+        print('%-10s %10.2f' % (k, v))
@@ -0,0 +1,146 @@
+"""
+Performance HUD, drawn in the top right corner of the window by display.draw_fps: an FPS counter, a spinner that
+turns on every drawn frame and a column of panels below them.
+
+Everything is cached: the counter is rendered again only when the integer FPS changes and the spinner frames are drawn
+once in a sprite sheet, so a frame costs a couple of blits. When the HUD is disabled draw returns immediately.
+F3 toggles the HUD and F4 the frame time graph at runtime.
+
+Panels are functions (surface, font, topright) -> height that draw below topright, aligned to the right, and return
+how many pixels they took: append your own to panels to show e.g. memory usage or how many draws a frame did.
+"""
+
+import collections
+import math
+
+from typing import Callable, Deque, List, Tuple
+
+import pygame
+
+import colors as c
+import glyphs
+import utils
+
+
+SPINNER_SIZE = (15, 15)
+SPINNER_FRAMES = 8  #: steps of pi / 4 in a full turn
+MARGIN = 5  #: pixels between the HUD and the window border and between its parts
+
+Panel = Callable[[pygame.Surface, pygame.font.Font, Tuple[int, int]], int]
+
+enabled = True  #: whether draw draws anything
+panels: List[Panel] = []  #: drawn one below the other, under the counter
+
+frame_ms = 0  #: milliseconds taken by the last frame, as passed to draw
+target_ms = 1000 / 60  #: milliseconds per frame at the target framerate, as passed to draw
+
+_fps = None  # integer FPS shown by _counter
+_counter = None
+_sheet = None
+_spinner_frame = 0
+
+
+def toggle() -> None:
+    global enabled
+    enabled = not enabled
+
+
+def spinner_sheet() -> pygame.Surface:
+    """
+    Returns the spinner sprite sheet: SPINNER_FRAMES frames side by side, drawn the first time.
+    """
+    global _sheet
+    if _sheet is None:
+        w, h = SPINNER_SIZE
+        _sheet = pygame.Surface((w * SPINNER_FRAMES, h))
+        for i in range(SPINNER_FRAMES):
+            angle = -(i + 1) * math.pi / 4 % (math.pi * 2)
+            frame = _sheet.subsurface((i * w, 0, w, h))
+            pygame.draw.arc(frame, c.WHITE, frame.get_rect(), angle, angle + math.pi / 4, 2)
+        _sheet = utils.convert(_sheet)
+    return _sheet
+
+
+def counter(font: pygame.font.Font, fps: float) -> pygame.Surface:
+    """
+    Returns the FPS counter, rendered again only when int(fps) changes.
+    """
+    global _fps, _counter
+    fps = int(fps)
+    if fps != _fps or _counter is None or _counter.get_height() != font.get_height():
+        text = '%d FPS' % fps
+        atlas = glyphs.glyph_atlas(font, c.WHITE)
+        _counter = pygame.Surface(atlas.size(text))
+        _counter.fill(c.BLACK)
+        atlas.blit(_counter, text, (0, 0))
+        _fps = fps
+    return _counter
+
+
+def draw(surface: pygame.Surface, font: pygame.font.Font, fps: float, frame_time: int = 0, target_fps: int = 60) -> None:
+    """
+    Draws the HUD in the top right corner of surface.
+    :param fps: the FPS to show.
+    :param frame_time: milliseconds taken by the last frame, for the panels.
+    :param target_fps: the framerate the game aims at, for the panels.
+    """
+    global _spinner_frame, frame_ms, target_ms
+    if not enabled:
+        return
+    frame_ms, target_ms = frame_time, 1000 / (target_fps or 60)
+    right = surface.get_width() - MARGIN
+    w, h = SPINNER_SIZE
+    surface.blit(spinner_sheet(), (right - w, MARGIN), (_spinner_frame * w, 0, w, h))
+    _spinner_frame = (_spinner_frame + 1) % SPINNER_FRAMES
+    text = counter(font, fps)
+    rect = text.get_rect(top=MARGIN, right=right - w)
+    surface.blit(text, rect)
+    y = rect.bottom + MARGIN
+    for panel in panels:
+        height = panel(surface, font, (right, y))
+        if height:
+            y += height + MARGIN
+
+
+class FrameTimeGraph(object):
+    """
+    Panel scrolling a bar per frame, as tall as the milliseconds it took: green within the target framerate, red
+    beyond it. Every frame scrolls the graph by a pixel and draws only the new bar.
+    """
+
+    def __init__(self, size: Tuple[int, int] = (120, 40)):
+        self.visible = False
+        self.surface = pygame.Surface(size)
+        self.surface.fill(c.BLACK)
+        self.times: Deque[int] = collections.deque(maxlen=size[0])
+
+    def __call__(self, surface: pygame.Surface, font: pygame.font.Font, topright: Tuple[int, int]) -> int:
+        if not self.visible:
+            return 0
+        w, h = self.surface.get_size()
+        self.times.append(frame_ms)
+        self.surface.scroll(-1, 0)
+        self.surface.fill(c.BLACK, (w - 1, 0, 1, h))
+        bar = min(h, frame_ms)
+        if bar:
+            self.surface.fill(c.GREEN if frame_ms <= target_ms else c.RED, (w - 1, h - bar, 1, bar))
+        surface.blit(self.surface, self.surface.get_rect(topright=topright))
+        return h
+
+
+graph = FrameTimeGraph()
+panels.append(graph)
+
+
+def handle_keydown(event: pygame.event.Event) -> bool:
+    """
+    Toggles the HUD with F3 and the frame time graph with F4.
+    :return: True if something was toggled, in which case the window must be drawn again.
+    """
+    if event.key == pygame.K_F3:
+        toggle()
+    elif event.key == pygame.K_F4:
+        graph.visible = not graph.visible
+    else:
+        return False
+    return True
@@ -0,0 +1,89 @@
+"""
+Map loading in stages, without freezing the window.
+"""
+
+import asyncio
+import logging
+import traceback
+
+import item
+import resources
+import room
+import state as s
+import tmx
+import unit
+import utils
+
+
+class MapLoader(object):
+    """
+    Loads a map and makes it the current one, reporting the progress. Awaiting load does the job: it needs
+    room.run_room_async, e.g. through Room.start_task.
+
+    The work that doesn't need the display runs on a worker thread of the event loop's executor: reading the tmx files
+    (XML, tileset images, layer data), parsing the yaml data files and decoding unit sprites.
+    The rest (surface conversion, creation of units and of the map) must run on the main thread: it's split in small
+    stages, run within the frame budget (see room.cooperate) so that the scene keeps animating in between.
+
+    progress (from 0 to 1) and stage (what is being done) can be read at any time to report the progress.
+    If loading fails, error holds the formatted traceback.
+    """
+
+    WORKER_SHARE = 0.7  #: fraction of progress made on the worker thread
+
+    def __init__(self, map_path: str):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.map_path = map_path
+        self.progress = 0.0
+        self.stage = _("Reading map")
+        self.error = None
+        self.files = tmx.MapFiles(map_path)
+        self.units_data = self.weapons_data = None
+
+    async def load(self) -> None:
+        """
+        Loads the map. It never raises: if loading fails, error is set instead.
+        """
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._work)
+            for _ in self._main():
+                await room.cooperate()
+            self.logger.info("Loaded %s", self.map_path)
+        except Exception:
+            self.error = traceback.format_exc()
+        finally:
+            resources.clear_preloaded_sprites()  # sprites of units that were not created
+
+    def _work(self) -> None:
+        def report(done, total):
+            self.progress = 0.4 * done / total
+        self.files.read(report)
+
+        self.stage = _("Reading units")
+        self.units_data = utils.load_yaml(resources.DATA_PATH / 'units.yml')
+        self.weapons_data = utils.load_yaml(resources.DATA_PATH / 'weapons.yml')
+        self.progress = 0.5
+
+        self.stage = _("Loading sprites")
+        names = self.files.unit_names()
+        for i, name in enumerate(names, 1):
+            try:
+                resources.preload_sprite(name)
+            except FileNotFoundError:
+                pass  # unit.Unit will fall back to the default image
+            self.progress = 0.5 + (self.WORKER_SHARE - 0.5) * i / len(names)
+
+    def _main(self):
+        """
+        Main thread stages. Each yield gives load a chance to wait for the next frame before the stage runs.
+        """
+        self.stage = _("Creating units")
+        yield
+        yaml_units = utils.parse_yaml(resources.DATA_PATH / 'units.yml', unit, self.units_data)
+        yaml_weapons = utils.parse_yaml(resources.DATA_PATH / 'weapons.yml', item, self.weapons_data)
+        self.progress = 0.85
+
+        self.stage = _("Building map")
+        yield
+        s.load_map(self.map_path, files=self.files, yaml_units=yaml_units, yaml_weapons=yaml_weapons)
+        self.progress = 1.0
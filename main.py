@@ -57,6 +57,10 @@ parser.add_argument('-l', '--logging', action='store', help=_('Choose logging le
                     required=False)
 parser.add_argument('-d', '--debug', action='store_const', help=_('Debug mode'), const=0, dest='logging')
 parser.add_argument('-f', '--file', action='store', help=_('Log file'), default=None, required=False)
+parser.add_argument('-p', '--profile', action='store', help=_('Profile frames and write a Chrome trace to this file'),
+                    default=None, required=False)
+parser.add_argument('-r', '--render', action='store', default=None, required=False,
+                    help=_('Render at this logical resolution, e.g. 1280x720, and scale it to the window'))
 args = parser.parse_args()
 
 # log to screen
@@ -70,6 +74,12 @@ if pygame.version.vernum < (2, 0, 0):
 
 def launch():
     import display
+    import profiler
+
+    if args.profile is not None:
+        profiler.enable(args.profile)
+    if args.render is not None:
+        display.logical_resolution = tuple(int(x) for x in args.render.split('x'))
 
     display.initialize()
 
@@ -24,7 +24,7 @@ class Arrow(pygame.sprite.Sprite):
         super().__init__(*groups)
         self.tilemap = tilemap
         self.zoom = -1
-        self.source_image = image
+        self.source_image = image.convert_alpha()
 
         self.arrow = {}
 
@@ -44,13 +44,15 @@ class Arrow(pygame.sprite.Sprite):
         w, h = self.source_image.get_size()
         rw, rh = rectsize = (w // 4, h // 4)
 
+        atlas = self.tilemap.atlas
+        atlas.set_scale(self.tilemap.zoom)
         arrow_parts = []
         for j in range(4):
             for i in range(4):
                 pos = (i * rw, j * rh)
                 rect = pygame.Rect(pos, rectsize)
                 img = pygame.Surface.subsurface(self.source_image, rect)
-                img = pygame.transform.scale(img, self.tilemap.zoom_tile_size)
+                img = atlas.add_scaled(('arrow', j * 4 + i), img, self.tilemap.zoom_tile_size)
                 arrow_parts.append(img)
 
         self.arrow = {
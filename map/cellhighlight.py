@@ -36,11 +36,14 @@ class CellHighlightLayer(tmx.SpriteLayer):
 
         self.empty()
 
+        atlas = self.tilemap.atlas
+        atlas.set_scale(self.tilemap.zoom)
         highlight_surfaces = {}
         for highlight, color in c.highlight.items():
-            highlight_surfaces[highlight] = pygame.Surface(self.tilemap.zoom_tile_size)
-            highlight_surfaces[highlight].fill(color[:3])
-            highlight_surfaces[highlight].set_alpha(color[3])
+            key = ('highlight', highlight)
+            if key not in atlas:
+                atlas.reserve(key, self.tilemap.zoom_tile_size).fill(color)
+            highlight_surfaces[highlight] = atlas[key]
 
         if selected is not None:
             self.add(CellHighlight(highlight_surfaces['selected'], self.cell_rect_at(selected)))
@@ -19,7 +19,7 @@ class Cursor(pygame.sprite.Sprite):
 
     def update(self, event=None):
         if not event:
-            coord = self.tilemap.index_at(*pygame.mouse.get_pos())
+            coord = self.tilemap.index_at(*display.get_mouse_pos())
             if coord:
                 self.point(*coord)
         elif event.type == pygame.KEYDOWN:
@@ -38,7 +38,10 @@ class Cursor(pygame.sprite.Sprite):
     def resize(self):
         pos = self.tilemap.pixel_at(*self.coord, False)
         self.rect = pygame.Rect(pos, self.tilemap.zoom_tile_size)
-        self.image = pygame.transform.scale(self.img, self.rect.size)
+        atlas = self.tilemap.atlas
+        atlas.set_scale(self.tilemap.zoom)
+        key = ('cursor',)
+        self.image = atlas[key] if key in atlas else atlas.add_scaled(key, self.img, self.rect.size)
 
     def register_cursor_moved(self, callback):
         self.callbacks.append(callback)
@@ -22,7 +22,7 @@ from basictypes import Point
 from map.arrow import Arrow
 from map.cellhighlight import CellHighlightLayer
 from map.cursor import Cursor
-from map.pathfinder import Pathfinder, Terrain, manhattan_path
+from map.pathfinder import Pathfinder, TerrainGrid, manhattan_path
 from map.unit import UnitSprite
 from room import Layout, LayoutParams, Background, BackgroundSize
 
@@ -34,25 +34,30 @@ class TileMap(room.Room):
     TileMap rendering.
     """
 
-    def __init__(self, map_path, **kwargs):
+    def __init__(self, map_path, files=None, yaml_units=None, yaml_weapons=None, **kwargs):
         """
-        
+        :param map_path: path of the tmx file.
+        :param files: optional tmx.MapFiles of map_path, already read (e.g. by loader.MapLoader).
+        :param yaml_units: optional units by name, as returned by utils.parse_yaml. Parsed here if None.
+        :param yaml_weapons: optional weapons by name, as returned by utils.parse_yaml. Parsed here if None.
         """
         super().__init__(wait=False,
                          background=Background(image=resources.load_image("old-paper.jpg"), size=BackgroundSize.COVER),
                          layout=Layout(width=LayoutParams.FILL_PARENT, height=LayoutParams.FILL_PARENT), **kwargs)
 
-        self.tilemap = tmx.load(map_path, self.rect.size, self.rect.topleft)
+        self.tilemap = tmx.load(map_path, self.rect.size, self.rect.topleft, files)
 
         self.zoom = self.tilemap.zoom = 2
         self.tw, self.th = (self.tilemap.tile_width, self.tilemap.tile_height)
         self.w, self.h = self.tilemap.width, self.tilemap.height
 
-        self.terrains = {}
+        self.terrains = TerrainGrid(self.w, self.h)
         self.sprites_layer = tmx.SpriteLayer()
 
-        yaml_units = utils.parse_yaml(resources.DATA_PATH / 'units.yml', unit)
-        yaml_weapons = utils.parse_yaml(resources.DATA_PATH / 'weapons.yml', item)
+        if yaml_units is None:
+            yaml_units = utils.parse_yaml(resources.DATA_PATH / 'units.yml', unit)
+        if yaml_weapons is None:
+            yaml_weapons = utils.parse_yaml(resources.DATA_PATH / 'weapons.yml', item)
 
         teams = {}
 
@@ -94,14 +99,9 @@ class TileMap(room.Room):
 
         self.units_manager = unit.UnitsManager(list(teams.values()))
 
-        for layer in reversed(self.tilemap.layers):
-            if isinstance(layer, tmx.Layer):
-                for cell in layer:
-                    coord = cell.x, cell.y
-                    units = self.units_manager.get_units(coord=coord)
-                    _unit = units[0] if units else None
-                    if coord not in self.terrains and cell.tile is not None:
-                        self.terrains[coord] = Terrain(cell.tile, _unit)
+        tile_layers = [layer for layer in reversed(self.tilemap.layers) if isinstance(layer, tmx.Layer)]
+        self.terrains.add_layers(tile_layers, self.tilemap.tilesets)
+        self.terrains.place_units(self.units_manager.units)
 
         cursor_layer = tmx.SpriteLayer()
         self.cursor = Cursor(self.tilemap, resources.load_image('cursor.png'), cursor_layer)
@@ -128,11 +128,12 @@ class TileMap(room.Room):
 
         self.path = Pathfinder(self)
         self.return_path = None  # stores the path to undo a move
+        self._action_menu = None  # reused every time the action menu is shown
 
     @property
     def curr_unit(self) -> Union[unit.Unit, None]:
         try:
-            return self.terrains[self.curr_sel].unit
+            return self.terrains.get_unit(self.curr_sel)
         except KeyError:
             return None
 
@@ -143,7 +144,7 @@ class TileMap(room.Room):
     @property
     def prev_unit(self) -> Union[unit.Unit, None]:
         try:
-            return self.terrains[self.prev_sel].unit
+            return self.terrains.get_unit(self.prev_sel)
         except KeyError:
             return None
 
@@ -157,7 +158,7 @@ class TileMap(room.Room):
     def is_obstacle(self, coord, for_unit=None):
         terrain = self.terrains[coord]
         try:
-            return self.units_manager.are_enemies(for_unit, terrain.unit)
+            return self.units_manager.are_enemies(for_unit, self.terrains.get_unit(coord))
         except AttributeError:
             if for_unit is None:
                 return False
@@ -236,8 +237,8 @@ class TileMap(room.Room):
         if who.coord != where:
             if self.get_unit(where) is not None:
                 raise ValueError("Destination %s is already occupied by another unit" % str(where))
-            self.terrains[who.coord].unit = None
-            self.terrains[where].unit = who
+            self.terrains.set_unit(who.coord, None)
+            self.terrains.set_unit(where, who)
             print(_('Unit %s moved from %s to %s') % (who.name, who.coord, where))
             who.move(where)
 
@@ -248,19 +249,20 @@ class TileMap(room.Room):
                 animation = self.make_move_unit_animation(_unit, self.prev_sel, self.return_path)
                 self.add_move_unit_animation(animation)
                 self.return_path = None
-            self.terrains[self.prev_sel].unit = _unit
-            self.terrains[self.curr_sel].unit = None
+            self.terrains.set_unit(self.prev_sel, _unit)
+            self.terrains.set_unit(self.curr_sel, None)
             _unit.move(self.prev_sel)
         self.reset_selection()
 
     def kill_unit(self, _unit):
         self.units_manager.kill_unit(_unit)
-        self.terrains[_unit.coord].unit = None
+        self.terrains.set_unit(_unit.coord, None)
         sprite = self.find_sprite(unit=_unit)
         self.sprites_layer.remove(sprite)
+        sprite.release()
 
     def get_unit(self, coord):
-        return self.terrains[coord].unit
+        return self.terrains.get_unit(coord)
 
     def find_sprite(self, **kwargs) -> UnitSprite:
         unit_sprite: UnitSprite
@@ -423,7 +425,6 @@ class TileMap(room.Room):
         self.tilemap.draw(self.surface)
         self.draw_children()
         self.valid = True
-        self.surface = self.surface.convert()
 
     def __set_attack_area(self, coord: Tuple[int, int], min_range: int, max_range: int):
         # Auxiliary method for update_move_attack_area and update_still_attack_area
@@ -530,7 +531,13 @@ class TileMap(room.Room):
         if pos is None:
             pos = self.tilemap.pixel_at(*self.curr_sel, False) - self.tilemap.viewport.topleft + \
                   self.tilemap.zoom_tile_size / 2
-        menu = rooms.ActionMenu(attacking, defending, layout=Layout(position=pos), padding=10, leading=5)
+        menu = self._action_menu
+        if menu is None or menu.parent is not None:
+            menu = self._action_menu = rooms.ActionMenu(attacking, defending, layout=Layout(position=pos),
+                                                        padding=10, leading=5)
+        else:
+            menu.attacking, menu.defending = attacking, defending
+            menu.layout.position = pos
         self.add_child(menu)
 
     def prepare_attack(self, _unit=None):
@@ -549,9 +556,7 @@ class TileMap(room.Room):
         assert(defending != attacking)
 
         # let the battle begin!
-        room.run_room(rooms.BattleAnimation(attacking, defending))
-
-        self.reset_selection()
+        room.push(rooms.BattleAnimation(attacking, defending, callback=self.reset_selection))
 
     def is_attack_click(self, mouse_pos):
         coord = self.tilemap.index_at(*mouse_pos)
@@ -626,6 +631,9 @@ class MoveUnitAnimation(room.Room):
     def loop(self, _events: List[pygame.event.Event], dt: int) -> None:
         super().loop(_events, dt)
         if self.next_path is None:
+            if self.sprite.prev_topleft != self.sprite.rect.topleft:
+                self.sprite.prev_topleft = self.sprite.rect.topleft  # arrived: stop drawing it in between steps
+                self.invalidate()
             return
         reached = self.sprite.move_animation(dt, self.next_path)
         self.invalidate()
@@ -3,18 +3,98 @@
 """
 
 
+import array
 import heapq
 
 
 class Terrain(object):
-    def __init__(self, tile, unit):
+    """
+    Terrain stats of a tile. One instance is shared by every cell showing that tile.
+    """
+    def __init__(self, tile):
         self.name = tile.properties.get('name', 'Unknown')
         self.moves = float(tile.properties.get('moves', 1))  # how many moves are required to move a unit through
         self.defense = int(tile.properties.get('defense', 0))  # bonus defense
         self.avoid = int(tile.properties.get('avoid', 0))  # bonus avoid
         self.allowed = tile.properties.get('allowed', 'earth').split(',')
         self.surface = tile.surface
-        self.unit = unit
+
+
+class TerrainGrid(object):
+    """
+    Terrain and occupant of every cell of the map.
+
+    Terrain stats are resolved once per tile gid in the table types. The grid itself is kinds, a flat array of
+    indices in types (-1 where there is no tile) in row, column order, while units is a parallel list of occupants.
+    """
+    def __init__(self, width, height):
+        self.w, self.h = width, height
+        self.types = []  # list of Terrain
+        self.type_index = {}  # tile gid -> index in types
+        self.kinds = array.array('i', [-1]) * (width * height)
+        self.units = [None] * (width * height)
+
+    def index(self, coord):
+        """
+        Index of coord in the flat grids. Like a dict, raises KeyError for anything not on the map (e.g. None).
+        """
+        try:
+            x, y = coord
+        except (TypeError, ValueError):
+            raise KeyError(coord)
+        if not (0 <= x < self.w and 0 <= y < self.h):
+            raise KeyError(coord)
+        return y * self.w + x
+
+    def __getitem__(self, coord):
+        kind = self.kinds[self.index(coord)]
+        if kind < 0:
+            raise KeyError(coord)
+        return self.types[kind]
+
+    def __len__(self):
+        return len(self.kinds) - self.kinds.count(-1)
+
+    def __contains__(self, coord):
+        try:
+            return self.kinds[self.index(coord)] >= 0
+        except KeyError:
+            return False
+
+    def add_layers(self, layers, tilesets):
+        """
+        Fills the cells still without terrain with the tiles of layers. Earlier layers take precedence.
+        :param layers: tmx.Layer list, topmost first.
+        :param tilesets: gid -> tmx.Tile mapping.
+        """
+        kinds, types, type_index = self.kinds, self.types, self.type_index
+        for layer in layers:
+            for x, y, gid in layer.iter_gids():
+                i = y * self.w + x
+                if kinds[i] < 0:
+                    kind = type_index.get(gid)
+                    if kind is None:
+                        kind = type_index[gid] = len(types)
+                        types.append(Terrain(tilesets[gid]))
+                    kinds[i] = kind
+
+    def place_units(self, units):
+        """
+        Fills the occupants in a single pass over units. The first unit found on a cell takes it.
+        """
+        for unit in units:
+            try:
+                i = self.index(unit.coord)
+            except KeyError:
+                continue
+            if self.units[i] is None:
+                self.units[i] = unit
+
+    def get_unit(self, coord):
+        return self.units[self.index(coord)]
+
+    def set_unit(self, coord, unit):
+        self.units[self.index(coord)] = unit
 
 
 class Pathfinder(object):
@@ -55,7 +135,7 @@ class Pathfinder(object):
         # All nodes initially in Q (unvisited nodes)
         Q = [v for v in self.dist]
 
-        source_unit = self.map[source].unit if enemies else None
+        source_unit = self.map.get_unit(source) if enemies else None
 
         while Q:
             min_dist = self.dist[Q[0]]
@@ -106,9 +186,9 @@ class Pathfinder(object):
             except TypeError:
                 u = self.prev[u]  # Traverse from target to source
 
-        s_unit = self.map[self.source].unit if enemies else None
+        s_unit = self.map.get_unit(self.source) if enemies else None
         for coord in reversed(S):
-            unit = self.map[coord].unit
+            unit = self.map.get_unit(coord)
             if unit or self.map.is_obstacle(coord, s_unit):
                 del S[-1]
             else:
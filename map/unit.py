@@ -6,6 +6,7 @@
 import pygame
 import logging
 
+import room
 import utils
 import colors as c
 from basictypes import Point
@@ -28,14 +29,40 @@ class UnitSprite(pygame.sprite.Sprite):
         self.unit = unit
         self.team = team
         self.zoom = -1
+        self.portrait = None  # unit image resized to fit the sprite at the current zoom
+        self.prev_topleft = None  # position before the last step of move_animation, see draw_topleft
 
         self.update()
 
+    def atlas_key(self):
+        """
+        Key of the atlas region holding the sprite image. Unit names are unique within a map.
+        """
+        return 'unit', self.unit.name
+
+    def release(self):
+        """
+        Gives the atlas region back, when the sprite is removed from the map.
+        """
+        self.tilemap.atlas.discard(self.atlas_key())
+
     def reposition(self):
         self.rect.left = int(self.rect.w * self.unit.coord[0])
         self.rect.top = int(self.rect.h * self.unit.coord[1])
+        self.prev_topleft = None
+
+    def draw_topleft(self):
+        """
+        Where to draw the sprite: in between its positions before and after the last step of move_animation, by
+        room.interpolation, so that it moves smoothly even if frames and simulation steps don't line up.
+        """
+        if self.prev_topleft is None:
+            return self.rect.topleft
+        (x0, y0), (x1, y1) = self.prev_topleft, self.rect.topleft
+        return int(x0 + (x1 - x0) * room.interpolation), int(y0 + (y1 - y0) * room.interpolation)
 
     def move_animation(self, delta, dest):
+        self.prev_topleft = self.rect.topleft
         if self.rect.topleft == dest:
             return True
         delta /= 200
@@ -57,9 +84,13 @@ class UnitSprite(pygame.sprite.Sprite):
     def zoom_changed(self):
         size = self.tilemap.zoom_tile_size
         pos = self.tilemap.pixel_at(*self.unit.coord, False)
-        self.image = pygame.Surface(size).convert_alpha()
+        atlas = self.tilemap.atlas
+        atlas.set_scale(self.tilemap.zoom)
+        self.image = atlas.reserve(self.atlas_key(), size)
         self.rect = pygame.Rect(pos, size)
+        self.prev_topleft = None
         self.zoom = self.tilemap.zoom
+        self.portrait = None
 
     def update(self):
         if self.zoom != self.tilemap.zoom:
@@ -80,16 +111,13 @@ class UnitSprite(pygame.sprite.Sprite):
         if src_img is None:
             self.image.blit(src_img, utils.center(self.image.get_rect(), src_img.get_rect()))
         else:
-            image_size = utils.resize_keep_ratio(src_img.get_size(), img_max_size)
-            resized_image = pygame.transform.smoothscale(src_img, image_size).convert_alpha()
-            self.image.blit(resized_image, utils.center(self.image.get_rect(), resized_image.get_rect()))
+            if self.portrait is None:
+                image_size = utils.resize_keep_ratio(src_img.get_size(), img_max_size)
+                self.portrait = pygame.transform.smoothscale(src_img, image_size).convert_alpha()
+            self.image.blit(self.portrait, utils.center(self.image.get_rect(), self.portrait.get_rect()))
 
         hp_bar_length = int(self.unit.health / self.unit.health_max * self.rect.w)
-        hp_bar = pygame.Surface((hp_bar_length, 5))
-        hp_bar.fill((0, 255, 0))
-        self.image.blit(hp_bar, (0, self.rect.h - 5))
+        self.image.fill((0, 255, 0), (0, self.rect.h - 5, hp_bar_length, 5))
 
         if self.team.is_boss(self.unit):
-            icon = pygame.Surface((3, 3))
-            icon.fill(c.BLUE)
-            self.image.blit(icon, (0, self.rect.h - 4))
+            self.image.fill(c.BLUE, (0, self.rect.h - 4, 3, 3))
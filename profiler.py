@@ -0,0 +1,157 @@
+"""
+Opt-in frame profiler.
+
+When enabled, room.run_room and the Room methods record how long every phase of a frame takes (events, loop, layout,
+draw, flip, tick), both for the whole frame and for every single room, using time.perf_counter_ns.
+Records can be exported as Chrome trace-event JSON (open it with chrome://tracing or https://ui.perfetto.dev) and are
+summarized by a rolling overlay drawn next to the FPS counter.
+"""
+
+import atexit
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+from contextlib import nullcontext
+from typing import Callable, Deque, Dict
+
+import pygame
+
+import colors as c
+
+
+PHASES = ('events', 'loop', 'layout', 'draw', 'flip', 'tick')  #: top level phases of a frame, in order
+WINDOW = 60  #: number of frames averaged by the overlay
+MAX_RECORDS = 1000000  #: older records are dropped beyond this limit
+
+enabled = False
+overlay = True  #: whether draw_overlay actually draws something
+records: Deque[dict] = collections.deque(maxlen=MAX_RECORDS)  #: Chrome trace events
+frames: Deque[Dict[str, int]] = collections.deque(maxlen=WINDOW)  #: nanoseconds spent in each phase, per frame
+
+_frame: Dict[str, int] = {}
+_origin = time.perf_counter_ns()
+_pid = os.getpid()
+_logger = logging.getLogger('Profiler')
+_NO_SPAN = nullcontext()
+
+
+def enable(trace_path: str = None) -> None:
+    """
+    Starts recording.
+    :param trace_path: if not None, the Chrome trace is exported there when the program exits.
+    """
+    global enabled
+    enabled = True
+    if trace_path is not None:
+        atexit.register(export, trace_path)
+    _logger.info("Profiling enabled")
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def clear() -> None:
+    records.clear()
+    frames.clear()
+    _frame.clear()
+
+
+def record(phase: str, name: str, start: int, end: int, top: bool = False) -> None:
+    """
+    Records a complete span.
+    :param phase: what was being done, e.g. 'draw'.
+    :param name: who was doing it, e.g. the name of a room.
+    :param start: perf_counter_ns at the start of the span.
+    :param end: perf_counter_ns at the end of the span.
+    :param top: True for the top level phases of a frame, which are summed per frame for the overlay.
+    """
+    records.append({'name': name, 'cat': phase, 'ph': 'X', 'pid': _pid, 'tid': threading.get_ident(),
+                    'ts': (start - _origin) / 1000, 'dur': (end - start) / 1000})
+    if top:
+        _frame[phase] = _frame.get(phase, 0) + end - start
+
+
+class _Span(object):
+    __slots__ = ('phase', 'name', 'top', 'start')
+
+    def __init__(self, phase: str, name: str, top: bool):
+        self.phase, self.name, self.top = phase, name, top
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *_):
+        record(self.phase, self.name, self.start, time.perf_counter_ns(), self.top)
+
+
+def span(phase: str, room, top: bool = True):
+    """
+    Context manager recording the time spent in its body. Does nothing if the profiler is disabled.
+    """
+    if not enabled:
+        return _NO_SPAN
+    return _Span(phase, str(room), top)
+
+
+def call(phase: str, room, method: Callable, *args):
+    """
+    Calls method(*args) recording the time it takes as a span of room.
+    """
+    start = time.perf_counter_ns()
+    try:
+        return method(*args)
+    finally:
+        record(phase, str(room), start, time.perf_counter_ns())
+
+
+def end_frame() -> None:
+    """
+    Called by run_room once per frame: moves the per phase totals of the last frame into the rolling window.
+    """
+    if _frame:
+        frames.append(dict(_frame))
+        _frame.clear()
+
+
+def averages() -> Dict[str, float]:
+    """
+    :return: the average milliseconds spent in each top level phase in the last WINDOW frames.
+    """
+    totals = collections.Counter()
+    for frame in frames:
+        totals.update(frame)
+    n = len(frames) or 1
+    return {phase: totals[phase] / n / 1e6 for phase in PHASES}
+
+
+def export(path: str) -> None:
+    """
+    Writes the records as Chrome trace-event JSON.
+    """
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': list(records), 'displayTimeUnit': 'ms'}, f)
+    _logger.info("Chrome trace with %d events written to %s", len(records), path)
+
+
+def draw_overlay(surface: pygame.Surface, font: pygame.font.Font, topright) -> int:
+    """
+    Draws the average time of each phase, one per line, below topright. It's a hud panel.
+    :return: the height of the overlay, 0 if nothing was drawn.
+    """
+    if not (enabled and overlay):
+        return 0
+    avg = averages()
+    lines = ['%s %.2f ms' % (phase, avg[phase]) for phase in PHASES]
+    lines.append('total %.2f ms' % sum(avg.values()))
+    right, y = topright
+    for line in lines:
+        rendered = font.render(line, True, c.WHITE, c.BLACK)
+        surface.blit(rendered, rendered.get_rect(top=y, right=right))
+        y += rendered.get_height()
+    return y - topright[1]
@@ -24,6 +24,7 @@ SPRITES_PATH = RESOURCES_PATH / 'sprites'
 DATA_PATH =    RESOURCES_PATH / 'data'
 
 __logger = logging.getLogger(__name__)
+__preloaded_sprites = {}  # path -> surface decoded ahead of time by preload_sprite
 
 
 def __load_log(path):
@@ -42,16 +43,37 @@ def load_sound(fname):
     return pygame.mixer.Sound(path)
 
 
-def load_font(name, size):
+def load_font_bytes(name):
     path = FONTS_PATH / name
     __load_log(path)
-    return pygame.font.Font(str(path), size)
+    return path.read_bytes()
 
 
 def load_sprite(fname):
+    path = str(sprite_path(fname))
+    try:
+        return __preloaded_sprites.pop(path)
+    except KeyError:
+        __load_log(path)
+        return pygame.image.load(path)
+
+
+def preload_sprite(fname):
+    """
+    Decodes a sprite ahead of time (e.g. on a loading thread): the next load_sprite of fname will return it.
+
+    :param fname: The name of the sprite, as passed to load_sprite.
+    """
     path = str(sprite_path(fname))
     __load_log(path)
-    return pygame.image.load(path)
+    __preloaded_sprites[path] = pygame.image.load(path)
+
+
+def clear_preloaded_sprites():
+    """
+    Drops the sprites preloaded but never loaded.
+    """
+    __preloaded_sprites.clear()
 
 
 def load_data(fname):
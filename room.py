@@ -3,11 +3,13 @@ This module is central in Ice Emblem's engine since it provides the Room class a
 upon Room objects.
 """
 
-from typing import Callable, List, Tuple, Union, Dict
+from typing import Callable, Iterator, List, Set, Tuple, Union, Dict
 
+import asyncio
 import pygame
 import pygame.locals as p
 import logging
+import time
 
 from enum import Flag, Enum, auto
 from pygame.surface import Surface, SurfaceType
@@ -16,11 +18,30 @@ import colors as c
 
 import events
 import display
+import hud
+import profiler
+import surfacepool
 import utils
 
 from basictypes import NESW, Point
 
 
+SIM_STEP = 1000 // display.fps  #: milliseconds simulated by every loop of rooms that don't wait for events
+MAX_SIM_STEPS = 5  #: simulation steps per frame after which a slow machine starts dropping simulated time
+
+interpolation = 0.0  #: fraction of SIM_STEP left over after the simulation steps of the frame, for drawing in between steps
+_on_screen = None  # root room whose surface is on the window, see draw_room
+FRAME_BUDGET = 8  #: milliseconds of a frame after which tasks awaiting cooperate yield back to rendering
+POLL_INTERVAL = 5  #: milliseconds between event polls of run_room_async when the scene waits for events
+
+_frame_start = time.perf_counter()  # when the current frame of run_room_async began
+_frame_drawn: Union[None, asyncio.Event] = None  # set when run_room_async ends a frame, see next_frame
+_scenes: List[Tuple['Room', Union[None, Callable]]] = []  # scene stack: (root room, callback), see push
+_unshown: Set['Room'] = set()  # pushed scenes not drawn yet
+_unwinding = False  # set while _main_loop ends the scenes left on the stack, see push
+loop_hooks: List[Callable[['Room', int], None]] = []  #: called after every loop of the scene on top with it and dt
+
+
 class Gravity(Flag):
     """
     Standard constants and tools for placing an object within a potentially larger container.
@@ -176,9 +197,7 @@ class Background(object):
     def fill(self, surface: pygame.Surface, area: pygame.Rect) -> None:
         if self.color:
             if area:
-                surf = pygame.Surface(area.size)
-                surf.fill(self.color)
-                surface.blit(surf, area)
+                surface.fill(tuple(self.color)[:3], area)  # opaque, like blitting a surface without per pixel alpha
             else:
                 surface.fill(self.color)
         if self.image:
@@ -197,6 +216,8 @@ class Background(object):
         else:
             new_size = (int(self.size[0] / 100 * surface_size[0]), int(self.size[1] / 100 * surface_size[1]))
 
+        if new_size == self.image.get_size():
+            return self.image
         if not self._bg_image_resized or new_size != self._bg_image_resized.get_size():
             self._bg_image_resized = pygame.transform.smoothscale(self.image, new_size)
 
@@ -212,6 +233,12 @@ class Room(object):
     named like handle_videoresize.
     """
 
+    _handlers: Dict[int, Union[Callable, None]] = {}  #: event type -> handle_* method, filled by event_handler
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._handlers = {}  # every subclass has its own dispatch table
+
     def __init__(self, **kwargs):
         """
         Initializes a Room object. You can pass no argument and the defaults will be used.
@@ -263,17 +290,21 @@ class Room(object):
         self.done: bool = False
         self.root: bool = False
         self.valid: bool = False
-        self.visible: bool = kwargs.get('visible', True)
+        self._visible: bool = kwargs.get('visible', True)
 
         self.background: Background = kwargs.get('background', Background())
         self.layout: Layout = kwargs.get('layout', Layout())
 
         self.rect: pygame.Rect = pygame.Rect((0, 0), (0, 0))
-        if self.background.transparent:
-            self.surface: pygame.Surface = pygame.Surface(self.rect.size, flags=pygame.SRCALPHA)
-        else:
-            self.surface: pygame.Surface = pygame.Surface(self.rect.size)
+        self.surface: pygame.Surface = surfacepool.EMPTY  # acquired from the pool by resize if visible
         self.callbacks: Dict[int, List[Callable]] = {}
+        self._dispatch: Dict[int, Tuple[Callable, ...]] = {}  # event type -> callbacks and handler, see dispatch
+        self.timers: Set[int] = set()  # ids of the timers set by set_timeout and set_interval
+        self.paused_timers: List[Tuple[int, Callable]] = []  # timeouts expired while this root was covered, see push
+        self.tasks: Set[asyncio.Task] = set()  # tasks started by start_task
+        self._measure_cache: Dict[Tuple, Tuple[int, int]] = {}  # see measure_if_needed
+        self.measure_count: int = 0  # how many times this room has been actually measured
+        self.layout_count: int = 0  # how many times this room has been actually laid out
         self.next: Union['Room', None] = kwargs.get('next', None)
 
         self.children: List['Room'] = []
@@ -370,9 +401,11 @@ class Room(object):
 
         The room_layout function will be called on the root Room before next frame.
         """
+        self._measure_cache.clear()
         node = self
         while node and node.layout.valid:
             node.layout.valid = False
+            node._measure_cache.clear()
             node = node.parent
         self.logger.debug("Layout requested")
 
@@ -419,9 +452,29 @@ class Room(object):
         The measured size should not exceed max_width and max_height otherwise the parent may clip the child.
         """
         for child in self.children:
-            child.measure(spec_width.at_most(), spec_height.at_most())
+            child.measure_if_needed(spec_width.at_most(), spec_height.at_most())
         self.resolve_measure(spec_width, spec_height, self.rect.w, self.rect.h)
 
+    def measure_if_needed(self, spec_width: MeasureParams, spec_height: MeasureParams) -> None:
+        """
+        Parents should call this instead of measure: the measured size is cached for each pair of MeasureParams and
+        reused until layout_request is called on this Room or on any of its descendants.
+        """
+        key = spec_width.mode, spec_width.value, spec_height.mode, spec_height.value
+        if self.layout.valid:
+            try:
+                self.measured_width, self.measured_height = self._measure_cache[key]
+                layout_counters.measures_cached += 1
+                return
+            except KeyError:
+                pass
+        else:
+            self._measure_cache.clear()  # may hold sizes measured before the last layout_request
+        self.measure(spec_width, spec_height)
+        self.measure_count += 1
+        layout_counters.measures += 1
+        self._measure_cache[key] = self.measured_size
+
     def resolve_measure(self, spec_width: MeasureParams, spec_height: MeasureParams, content_width: int,
                         content_height: int) -> None:
         """
@@ -464,11 +517,24 @@ class Room(object):
         """
         w, h = 0, 0
         for child in self.children:
-            child.layout_children(pygame.Rect(child.layout.position, child.measured_size))
+            child.layout_if_needed(pygame.Rect(child.layout.position, child.measured_size))
             w = max(w, child.rect.w)
             h = max(h, child.rect.h)
         self.resolve_layout(rect)
 
+    def layout_if_needed(self, rect: pygame.Rect) -> None:
+        """
+        Parents should call this instead of layout_children: the subtree is laid out again only if rect changed or
+        layout_request was called on this Room or on any of its descendants.
+        :param rect: contains the position and size this child should use.
+        """
+        if self.layout.valid and self.rect == rect:
+            layout_counters.layouts_skipped += 1
+            return
+        self.layout_children(rect)
+        self.layout_count += 1
+        layout_counters.layouts += 1
+
     def resolve_layout(self, rect: pygame.Rect) -> None:
         """
         An handy method to finalize layout.
@@ -482,24 +548,53 @@ class Room(object):
     def resize(self, size: Tuple[int, int]) -> None:
         """
         If size is different from self.rect.size then resizes this.surface, calls self.fill and self.invalidate.
+        Surfaces come from surfacepool; invisible rooms don't get one until they become visible.
         :param size:
         :return:
         """
         if self.rect.size != size:
             self.rect.size = size
-            if self.background.transparent:
-                self.surface: pygame.Surface = pygame.Surface(self.rect.size, flags=pygame.SRCALPHA)
+            surfacepool.release(self.surface)
+            if self._visible:
+                self.surface = surfacepool.acquire(self.rect.size, self.background.transparent)
             else:
-                self.surface: pygame.Surface = pygame.Surface(self.rect.size)
+                self.surface = surfacepool.EMPTY
             self.fill()
             self.invalidate()
 
-    def handle_videoresize(self, _event: pygame.event.Event) -> None:
+    def release_surface(self) -> None:
         """
-        Request new layout on resize event.
-        :param _event: useless
+        Gives self.surface back to surfacepool. Called when this Room leaves the tree: if it's used again it gets a new
+        surface when laid out.
         """
-        self.layout_request()
+        surfacepool.release(self.surface)
+        self.surface = surfacepool.EMPTY
+        self.rect.size = (0, 0)
+        self.layout.valid = False
+        self._measure_cache.clear()
+        self.valid = False
+
+    @property
+    def visible(self) -> bool:
+        """
+        Whether this Room is drawn on its parent. Invisible rooms have no surface until they become visible.
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        self._visible = visible
+        if visible and self.surface.get_size() != self.rect.size:
+            self.surface = surfacepool.acquire(self.rect.size, self.background.transparent)
+            self.fill()
+
+    def handle_videoresize(self, event: pygame.event.Event) -> None:
+        """
+        Request new layout on resize event. With a logical resolution only its own changes matter: a resized window
+        just gets it scaled differently.
+        """
+        if display.logical_resolution is None or event.size == display.get_size():
+            self.layout_request()
 
     def toggle_visibility(self) -> None:
         """
@@ -533,7 +628,10 @@ class Room(object):
         :param dt: number of elapsed milliseconds since last frame
         """
         for child in self.children:
-            child.loop(_events, dt)
+            if profiler.enabled:
+                profiler.call('loop', child, child.loop, _events, dt)
+            else:
+                child.loop(_events, dt)
             if child.done and child.die_when_done:
                 child.end()
 
@@ -553,7 +651,10 @@ class Room(object):
         for child in self.children:
             if child.visible:
                 if not child.valid:
-                    child.draw()
+                    if profiler.enabled:
+                        profiler.call('draw', child, child.draw)
+                    else:
+                        child.draw()
                 self.surface.blit(child.surface, child.rect)
 
     def fill(self, area=None) -> None:
@@ -592,9 +693,13 @@ class Room(object):
         Ends life-cycle of this Room. Unregisters all callbacks and removes himself from parent if self.die_when_done is
         true.
         """
-        for event_type in self.callbacks:
-            if event_type >= p.USEREVENT and self.callbacks[event_type]:
-                events.stop_timer(event_type)
+        for timer_id in self.timers:
+            events.stop_timer(timer_id)
+        self.timers.clear()
+        self.paused_timers.clear()
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
         self.logger.debug("end")
         self.end_children()
         if self.parent:
@@ -602,6 +707,38 @@ class Room(object):
                 self.parent.add_child(self.next)
             if self.die_when_done:
                 self.parent.remove_child(self)
+                self.release_surface()
+
+    @classmethod
+    def event_handler(cls, event_type: int) -> Union[Callable, None]:
+        """
+        Returns the method of this class named like handle_mousebuttondown that handles event_type, or None.
+
+        The name lookup is done only the first time for each class and event type.
+        """
+        try:
+            return cls._handlers[event_type]
+        except KeyError:
+            name = 'handle_' + pygame.event.event_name(event_type).lower()
+            handler = cls._handlers[event_type] = getattr(cls, name, None)
+            return handler
+
+    def dispatch(self, event_type: int) -> Tuple[Callable, ...]:
+        """
+        Returns everything that has to be called for an event of event_type: registered callbacks first, then the
+        handle_* method bound to self.
+
+        The result is cached until a callback is registered or unregistered for event_type.
+        """
+        try:
+            return self._dispatch[event_type]
+        except KeyError:
+            handlers = tuple(self.callbacks.get(event_type, ()))
+            handler = self.event_handler(event_type)
+            if handler is not None:
+                handlers += (handler.__get__(self, type(self)),)
+            self._dispatch[event_type] = handlers
+            return handlers
 
     def process_events(self, _events):
         """
@@ -610,16 +747,21 @@ class Room(object):
         """
         processed = False
         for child in self.children:
-            processed = processed or child.process_events(_events)
+            if processed:
+                break
+            if profiler.enabled:
+                processed = profiler.call('events', child, child.process_events, _events)
+            else:
+                processed = child.process_events(_events)
         if processed:
             return
+        dispatch = self._dispatch
         for event in _events:
-            if event.type in self.callbacks:
-                for callback in self.callbacks[event.type]:
-                    processed = processed or callback(event)
-            method = getattr(self, 'handle_' + pygame.event.event_name(event.type).lower(), None)
-            if method is not None:
-                processed = processed or method(event)
+            handlers = dispatch.get(event.type)
+            if handlers is None:
+                handlers = self.dispatch(event.type)
+            for handler in handlers:
+                processed = processed or handler(event)
         return processed
 
     def register(self, event_type: int, callback: Callable) -> None:
@@ -631,6 +773,7 @@ class Room(object):
                 self.callbacks[event_type].append(callback)
         else:
             self.callbacks[event_type] = [callback]
+        self._dispatch.pop(event_type, None)
         self.logger.debug('registered %s -> %s', pygame.event.event_name(event_type), callback)
 
     def unregister(self, event_type: int, callback: Callable = None):
@@ -642,40 +785,98 @@ class Room(object):
                 self.callbacks[event_type].remove(callback)
         elif len(self.callbacks[event_type]) > 0:
             self.callbacks[event_type].pop()
+        self._dispatch.pop(event_type, None)
         self.logger.debug('unregistered %s -> %s', pygame.event.event_name(event_type), callback)
 
     def set_timeout(self, time: int, callback: Callable) -> int:
         """
         This method is kind of inspired from JS's SetTimeout. It calls callback only once approximately after time
         milliseconds. When this room ends the timer is cancelled too.
+        If the timer expires while the scene of the room is covered by a pushed one, the callback is called when the
+        scene is back on top. If the room is not in any scene, the callback is not called.
         :param time: time in milliseconds
-        :param callback: callback function
-        :return: an int between pygame.USEREVENT and pygame.NUMEVENTS which can be used to stop the timer by calling
-        Room.unregister
-        """
-        event_type = events.new_timer(time)
-
-        def callme(_event: int) -> bool:
-            events.stop_timer(event_type)
-            self.unregister(event_type, callme)
-            return callback(_event)
-
-        self.register(event_type, callme)
-        return event_type
+        :param callback: callback function, called with the timer id
+        :return: the timer id, which can be used to stop the timer by calling Room.clear_timer
+        """
+        def callme(timer_id: int) -> bool:
+            if timer_id not in self.timers:
+                return  # cleared or ended while paused
+            root = self.root_room()
+            if root.root and _scenes[-1][0] is not root:
+                root.paused_timers.append((timer_id, callme))
+                return
+            self.timers.discard(timer_id)
+            if root.root:
+                return callback(timer_id)
+
+        timer_id = events.new_timer(time, callme)
+        self.timers.add(timer_id)
+        return timer_id
 
     def set_interval(self, time: int, callback: Callable) -> int:
         """
         This method is kind of inspired from JS's setInterval.
 
-        It calls callback every time milliseconds until this room ends or Room.unregister is called.
+        It calls callback every time milliseconds until this room ends or Room.clear_timer is called. Calls are skipped
+        while the room is not running, e.g. while its scene is covered by a pushed one.
         :param time: time in milliseconds
-        :param callback: callback function
-        :return: an int between pygame.USEREVENT and pygame.NUMEVENTS which can be used to stop the timer by calling
-        Room.unregister
+        :param callback: callback function, called with the timer id
+        :return: the timer id, which can be used to stop the timer by calling Room.clear_timer
+        """
+        def callme(timer_id: int) -> bool:
+            if self.is_running():
+                return callback(timer_id)
+
+        timer_id = events.new_timer(time, callme, repeat=True)
+        self.timers.add(timer_id)
+        return timer_id
+
+    def start_task(self, coroutine, callback: Callable = None) -> asyncio.Task:
+        """
+        Runs a coroutine as an asyncio task while the current scene keeps animating. Needs run_room_async.
+        The task is cancelled when this room ends. Blocking work can be awaited with
+        asyncio.get_running_loop().run_in_executor, work on the main thread should await cooperate from time to time.
+        :param coroutine: the coroutine to run.
+        :param callback: called with the result of the coroutine when it completes.
+        :return: the task.
+        """
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+
+        def done(_task: asyncio.Task) -> None:
+            self.tasks.discard(_task)
+            if _task.cancelled():
+                return
+            if _task.exception() is not None:
+                self.logger.error("Task failed", exc_info=_task.exception())
+            elif callback is not None:
+                callback(_task.result())
+
+        task.add_done_callback(done)
+        return task
+
+    def root_room(self) -> 'Room':
+        """
+        Returns the root of the tree this Room is in.
         """
-        event_type = events.new_timer(time)
-        self.register(event_type, callback)
-        return event_type
+        node = self
+        while node.parent:
+            node = node.parent
+        return node
+
+    def is_running(self) -> bool:
+        """
+        Returns True if this Room is in the tree of the scene on top of the stack: the scenes beneath it are paused.
+        """
+        node = self.root_room()
+        return node.root and _scenes[-1][0] is node
+
+    def clear_timer(self, timer_id: int) -> None:
+        """
+        Stops a timer set by set_timeout or set_interval.
+        """
+        events.stop_timer(timer_id)
+        self.timers.discard(timer_id)
 
     def bind_keys(self, keys, callback):
         """
@@ -763,14 +964,37 @@ class Room(object):
 
 
 class RunRoomAsRoot(Room):
+    """
+    Pushes a room on the scene stack when it begins and is done when that room is over.
+    """
     def __init__(self, room, **kwargs):
         super().__init__(**kwargs)
         self.room = room
 
     def begin(self):
         super().begin()
-        run_room(self.room)
-        self.done = True
+        push(self.room, self.mark_done)
+
+
+class LayoutCounters(object):
+    """
+    Counts the work done by the last layout_room call. Useful to check that layout stays incremental.
+    """
+    def __init__(self):
+        self.measures = 0  #: measure calls
+        self.measures_cached = 0  #: measure calls avoided thanks to the cache
+        self.layouts = 0  #: layout_children calls
+        self.layouts_skipped = 0  #: layout_children calls avoided because nothing changed
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def __repr__(self) -> str:
+        return "<LayoutCounters measures: %d (%d cached) layouts: %d (%d skipped)>" % (
+            self.measures, self.measures_cached, self.layouts, self.layouts_skipped)
+
+
+layout_counters = LayoutCounters()
 
 
 class RoomStop(Exception):
@@ -785,6 +1009,7 @@ def layout_room(room: Room) -> None:
     Layout the root Room.
     :param room: the root Room
     """
+    layout_counters.reset()
     if Gravity.FILL_HORIZONTAL in room.layout.gravity:
         spec_width = MeasureParams(MeasureSpec.EXACTLY, display.get_width())
     else:
@@ -793,7 +1018,7 @@ def layout_room(room: Room) -> None:
         spec_height = MeasureParams(MeasureSpec.EXACTLY, display.get_height())
     else:
         spec_height = MeasureParams(MeasureSpec.AT_MOST, display.get_height())
-    room.measure(spec_width, spec_height)
+    room.measure_if_needed(spec_width, spec_height)
 
     rect = pygame.Rect((0, 0), room.measured_size)
 
@@ -814,72 +1039,277 @@ def layout_room(room: Room) -> None:
     elif Gravity.CENTER_VERTICAL in room.layout.gravity:
         rect.centery = display.get_height() // 2
 
-    room.layout_children(rect)
+    room.layout_if_needed(rect)
+    logging.debug("Layout of %s: %s", room, layout_counters)
 
 
 def draw_room(room: Room, first_draw=False):
     """
-    Draws the root Room.
+    Draws the root Room. Nothing is done if the room is valid and already on the window.
     :param room: the room to draw.
     :param first_draw: True if it's the first frame.
     """
-    if room.clear_screen:
-        display.window.fill(room.clear_screen)
+    global _on_screen
+    if room.valid and room.layout.valid and not first_draw and _on_screen is room:
+        return
     if not room.layout.valid:
-        layout_room(room)
-    if first_draw:
-        room.fill_recursive()
-    if not room.valid:
-        room.draw()
-    display.window.blit(room.surface, room.rect)
-    display.draw_fps()
-    display.flip()
+        with profiler.span('layout', room):
+            layout_room(room)
+    with profiler.span('draw', room):
+        if room.clear_screen:
+            display.window.fill(room.clear_screen)
+        if first_draw:
+            room.fill_recursive()
+        if not room.valid:
+            room.draw()
+        display.window.blit(room.surface, room.rect)
+        display.draw_fps()
+    with profiler.span('flip', room):
+        display.flip()
+    _on_screen = room
 
 
 def generic_event_handler(_events: List[pygame.event.Event]) -> None:
     """
-    Handle common events.
+    Handle common events, whatever the scene on top allows.
     :param _events:
     :return:
     """
+    global _on_screen
     for event in _events:
         if event.type == pygame.QUIT:
             utils.return_to_os()
+        elif event.type == pygame.VIDEORESIZE:
+            _on_screen = None  # draw even a valid scene again, e.g. to scale it to the new size of the display
+        elif event.type == pygame.KEYDOWN:
+            if hud.handle_keydown(event):
+                _on_screen = None  # draw the window again even if the scene is valid
 
 
-def run_room(room: Room) -> None:
+def _display_lost() -> None:
     """
-    Runs a Room.
-    :param room: root Room
+    Makes the next frame draw the whole window again, after display.modeset.
+    """
+    global _on_screen
+    _on_screen = None
+
+
+display.modeset_hooks.append(_display_lost)
+
+
+def push(room: Room, callback: Callable = None) -> None:
     """
-    allowed_events = list(events.get_allowed())
-    if room.allowed_events:
-        events.set_allowed(room.allowed_events)
+    Shows a modal room on top of the running scene without blocking.
+
+    The room is begun straight away and run by the main loop until it's done, while the scenes beneath it are paused.
+    Then it's ended and popped off the stack and callback is called with the room as its argument.
+    Must be called while run_room is running, e.g. from an event handler or from loop.
+    :param room: the Room to show.
+    :param callback: called when room is over.
+    """
+    if _unwinding:
+        return  # e.g. pushed by the end of a scene left on RoomStop: nothing would run it
     room.root = True
     room.done = False
     room.valid = False
     room.layout.valid = False
+    _scenes.append((room, callback))
+    _unshown.add(room)
     room.begin()
-    draw_room(room, first_draw=True)
-    dt = display.tick(room.fps)
-
-    while not room.done:
-        if not room.wait_valid:
-            room.wait_update()
-        if room.wait and not pygame.event.peek(list(events.get_allowed())):
-            _events = [pygame.event.wait()]
-        else:
-            _events = pygame.event.get()
-        generic_event_handler(_events)
-        room.process_events(_events)
-        room.loop(_events, dt)
-        draw_room(room)
-        dt = display.tick(room.fps)
 
+
+def push_sequence(scenes: Iterator[Room], callback: Callable = None) -> None:
+    """
+    Pushes the rooms yielded by scenes one at a time: the next one is requested when the previous one is over, so
+    scenes can be a generator that does some work in between.
+    :param scenes: the rooms to show.
+    :param callback: called without arguments when scenes is exhausted, after the last room is over.
+    """
+    def push_next(_=None):
+        try:
+            scene = next(scenes)
+        except StopIteration:
+            if callback is not None:
+                callback()
+            return
+        push(scene, push_next)
+    push_next()
+
+
+def _pop() -> None:
+    """
+    Ends the scene on top of the stack and calls its callback.
+    """
+    room, callback = _scenes.pop()
+    _unshown.discard(room)
     room.end()
-    if room.allowed_events:
-        events.set_allowed(allowed_events)
     room.root = False
+    room.release_surface()
+    if callback is not None:
+        callback(room)
+
+
+def _resume_timers(scene: Room) -> None:
+    """
+    Calls the timeouts of the tree of scene that expired while it was covered, now that it's back on top.
+    """
+    paused, scene.paused_timers = scene.paused_timers, []
+    for timer_id, callme in paused:
+        callme(timer_id)
+
+
+def _allowed_events(index: int) -> Union[None, Set[int]]:
+    """
+    :return: the event types the scene at index can process, inherited from the scenes beneath if it doesn't say; None
+    if they are all allowed.
+    """
+    for room, _ in reversed(_scenes[:index + 1]):
+        if room.allowed_events:
+            return set(room.allowed_events).union(events.ALWAYS_ALLOWED)
+    return None
+
+
+def _draw_backdrop() -> None:
+    """
+    Draws again the scenes beneath the top one, from their cached surfaces, for when the window has been lost.
+    """
+    for room, _ in _scenes[:-1]:
+        if room.valid and room.layout.valid:
+            if room.clear_screen:
+                display.window.fill(room.clear_screen)
+            display.window.blit(room.surface, room.rect)
+
+
+_WAIT, _TICK = 'wait', 'tick'  # requests of _main_loop to its driver
+
+
+def _main_loop(room: Room):
+    """
+    The main loop shared by run_room and run_room_async, as a generator that leaves waiting to its driver.
+
+    It yields (_WAIT, None) when the scene on top waits for events and there are none: the driver must send back a
+    list of events. It yields (_TICK, fps) at the end of every frame: the driver must keep the framerate and send back
+    the milliseconds elapsed since the last tick.
+    """
+    global interpolation, _on_screen, _unwinding
+    base = len(_scenes)
+    # credit the time elapsed since the last frame to timers now, so that those set in begin don't count it
+    events.update_timers((yield _TICK, room.fps))
+    push(room)
+    dt = lag = 0
+    top = allowed = None
+    pending = []  # events processed but not yet passed to loop, for when no simulation step runs in a frame
+
+    try:
+        while len(_scenes) > base:
+            if _scenes[-1][0] is not top:
+                _resume_timers(_scenes[-1][0])
+                top = _scenes[-1][0]
+                allowed = _allowed_events(len(_scenes) - 1)
+                lag = 0
+                pending = []
+            if top in _unshown:
+                _unshown.discard(top)
+                draw_room(top, first_draw=True)
+                dt += yield _TICK, top.fps
+            if not top.wait_valid:
+                top.wait_update()
+            active = pygame.display.get_active()
+            with profiler.span('events', top):
+                fired = events.update_timers(dt)
+            if (top.wait or not active) and not fired and not events.peek():
+                with profiler.span('wait', top, top=False):
+                    _events = yield _WAIT, None
+            else:
+                _events = pygame.event.get()
+            with profiler.span('events', top):
+                display.map_events(_events)
+                generic_event_handler(_events)
+                if allowed is not None:
+                    _events = [e for e in _events if e.type in allowed]
+                top.process_events(_events)
+            with profiler.span('loop', top):
+                if not active:
+                    lag = 0
+                    pending = []
+                    interpolation = 0.0
+                    _on_screen = None  # the window must be drawn again when restored
+                elif top.wait:
+                    lag = 0
+                    interpolation = 0.0
+                    top.loop(pending + _events, dt)
+                    for hook in loop_hooks:
+                        hook(top, dt)
+                    pending = []
+                else:
+                    lag += dt
+                    steps = 0
+                    # known before stepping, so that the steps can already place things for the frame to be drawn
+                    interpolation = lag % SIM_STEP / SIM_STEP
+                    pending.extend(_events)
+                    while lag >= SIM_STEP and not top.done and _scenes[-1][0] is top:
+                        if steps == MAX_SIM_STEPS:
+                            logging.debug("Dropping %d ms of simulation", lag - lag % SIM_STEP)
+                            lag %= SIM_STEP
+                            break
+                        top.loop(pending, SIM_STEP)
+                        for hook in loop_hooks:
+                            hook(top, SIM_STEP)
+                        pending = []
+                        lag -= SIM_STEP
+                        steps += 1
+            scene = _scenes[-1][0]
+            if active and scene not in _unshown:
+                if _on_screen is None and len(_scenes) > 1:
+                    _draw_backdrop()
+                draw_room(scene)
+            with profiler.span('tick', top):
+                dt = yield _TICK, scene.fps
+            profiler.end_frame()
+
+            while len(_scenes) > base and _scenes[-1][0].done:
+                _pop()
+    finally:
+        unwinding, _unwinding = _unwinding, True
+        try:
+            while len(_scenes) > base:  # e.g. on RoomStop: end the scenes left like _pop, but without their callbacks
+                scene, _ = _scenes.pop()
+                _unshown.discard(scene)
+                scene.end()
+                scene.root = False
+                scene.release_surface()
+        finally:
+            _unwinding = unwinding
+        _on_screen = None
+
+
+def run_room(room: Room) -> None:
+    """
+    Runs a Room, returning when it's over.
+
+    The room is pushed on the scene stack and the main loop runs whatever scene is on top until this one is popped:
+    modal rooms shown meanwhile with push are run by this same loop. Scenes don't change the allowed events of pygame,
+    they just ignore the events they don't allow.
+
+    Rooms that wait for events get a loop call for every frame, that is for every batch of events, with the real
+    elapsed time. The others are simulated at a fixed rate instead: each frame runs as many loops of SIM_STEP
+    milliseconds as the elapsed time allows, so that animations take the same time and go through the same steps
+    however fast the machine is. Frames are drawn only if something is invalid and nothing is simulated nor drawn while
+    the window is minimized.
+    :param room: root Room
+    """
+    loop = _main_loop(room)
+    try:
+        request, fps = next(loop)
+        while True:
+            if request is _WAIT:
+                request, fps = loop.send([events.wait()])
+            else:
+                request, fps = loop.send(display.tick(fps))
+    except StopIteration:
+        return
+    finally:
+        loop.close()  # on exceptions, e.g. RoomStop from display.tick, end the scenes now
 
 
 def run(first_room):
@@ -896,8 +1326,126 @@ def run(first_room):
         room.root = False
 
 
+async def _wait_async() -> List[pygame.event.Event]:
+    """
+    Like events.wait, but lets other tasks run while there are no events.
+    """
+    if not events.blocking:
+        await asyncio.sleep(0)
+        return [events.wait()]
+    timeout = events.timers.next_due()
+    waited = 0
+    while not events.peek():
+        if timeout is not None and waited >= timeout:
+            return [events.EMPTY_EVENT]
+        await asyncio.sleep(POLL_INTERVAL / 1000)
+        waited += POLL_INTERVAL
+    return pygame.event.get()
+
+
+async def _tick_async(fps: int) -> int:
+    """
+    Like display.tick, but lets other tasks run until the next frame is due.
+    """
+    global _frame_start
+    if events.blocking:
+        delay = 1 / (fps or display.fps) - (time.perf_counter() - _frame_start)
+        await asyncio.sleep(max(0.0, delay))  # even if late, give tasks a chance to run
+        dt = display.tick(0)
+    else:
+        await asyncio.sleep(0)  # e.g. headless: the clock doesn't sleep, so neither does this
+        dt = display.tick(fps)
+    _frame_start = time.perf_counter()
+    _frame_drawn.set()
+    _frame_drawn.clear()
+    return dt
+
+
+async def run_room_async(room: Room) -> None:
+    """
+    Like run_room, but driven by the running asyncio event loop: tasks (see Room.start_task) run while the loop waits
+    for events or for the next frame, so rooms can await futures, e.g. from run_in_executor, and the scene on top keeps
+    animating meanwhile.
+    :param room: root Room
+    """
+    global _frame_drawn, _frame_start
+    if _frame_drawn is not None:
+        _frame_drawn.set()  # wake up who was waiting for a frame of a previous run
+    _frame_drawn = asyncio.Event()
+    _frame_start = time.perf_counter()
+    loop = _main_loop(room)
+    try:
+        request, fps = next(loop)
+        while True:
+            if request is _WAIT:
+                request, fps = loop.send(await _wait_async())
+            else:
+                request, fps = loop.send(await _tick_async(fps))
+    except StopIteration:
+        return
+    finally:
+        loop.close()
+
+
+async def run_async(first_room) -> None:
+    """
+    Like run, but with run_room_async. Use it as asyncio.run(room.run_async(first_room)).
+    :param first_room: the first Room to execute.
+    """
+    room = first_room
+    try:
+        while room:
+            await run_room_async(room)
+            room = room.next
+    except RoomStop:
+        room.root = False
+
+
+def over_budget() -> bool:
+    """
+    Returns True if the current frame took longer than FRAME_BUDGET milliseconds so far.
+    """
+    return (time.perf_counter() - _frame_start) * 1000 > FRAME_BUDGET
+
+
+async def next_frame() -> None:
+    """
+    Waits until the next frame is drawn. Needs run_room_async.
+    """
+    await _frame_drawn.wait()
+
+
+async def cooperate() -> None:
+    """
+    Frame budget guard for tasks doing long computations on the main thread: awaiting it in between chunks of work
+    yields back to rendering until the next frame if the current one is over budget.
+    """
+    if over_budget():
+        await next_frame()
+
+
 def stop() -> None:
     """
     Stops all running room.
     """
     raise RoomStop()
+
+
+if __name__ == '__main__':
+    import timeit
+
+    # Microbenchmark: routes a batch of MOUSEMOTION events through a deep tree where nobody handles them
+    class Node(Room):
+        def handle_keydown(self, event):
+            pass
+
+    pygame.init()
+    depth, batch, repeat = 20, 100, 200
+    root = leaf = Node()
+    for _ in range(depth):
+        child = Node()
+        leaf.add_child(child)
+        leaf = child
+    motion = [pygame.event.Event(p.MOUSEMOTION, pos=(i, i), rel=(1, 1), buttons=(0, 0, 0)) for i in range(batch)]
+    seconds = timeit.timeit(lambda: root.process_events(motion), number=repeat)
+    print("%.1f ns per event per room" % (seconds / (repeat * batch * (depth + 1)) * 1e9))
@@ -53,6 +53,7 @@ class ActionMenu(gui.Menu):
     def __init__(self, attacking, defending=None, **kwargs):
         self.attacking = attacking
         self.defending = defending
+        self.with_attack = None  # whether the entries set by begin include Attack, None if they have been replaced
         super().__init__([], SMALL, dismiss_callback=self.undo, **kwargs)
 
     def menu_attack(self):
@@ -73,6 +74,7 @@ class ActionMenu(gui.Menu):
                 self.parent.reset_selection()
             return _set
         self.menu_entries = [(i.name, setitem(i)) for i in unit.items]
+        self.with_attack = None
         self.done = False
 
     def menu_wait(self):
@@ -100,11 +102,20 @@ class ActionMenu(gui.Menu):
     def begin(self):
         self.parent: map.Map
         super().begin()
+        # the same instance is shown again every time
+        self.done = False
+        self.choice = None
+        self.visible = True
+        with_attack = len(self.parent.nearby_enemies()) > 0
+        if with_attack == self.with_attack:
+            self.set_index(None)  # keep the rendered entries, but not the highlight of last time
+            return
+        self.with_attack = with_attack
         self.menu_entries = [
             (_("Attack"), lambda *_: self.menu_attack()),
             (_("Items"), lambda *_: self.menu_items()),
             (_("Wait"), lambda *_: self.menu_wait()),
-        ] if len(self.parent.nearby_enemies()) > 0 else [
+        ] if with_attack else [
             (_("Items"), lambda *_: self.menu_items()),
             (_("Wait"), lambda *_: self.menu_wait()),
         ]
@@ -19,7 +19,7 @@ from gettext import gettext as _
 class AttackAnimation(gui.Tween):
     def __init__(self, image, vector, on_animation_finished):
         super().__init__(vector, 200, callback=on_animation_finished, die_when_done=False)
-        self.text = gui.Label("", f.SMALL, visible=False)
+        self.text = gui.Label("", f.SMALL, visible=False, glyphs=True)
         self.image = gui.Image(image, die_when_done=False)
         self.add_children(self.text, self.image)
 
@@ -41,7 +41,7 @@ class BattleUnitStats(gui.LinearLayout):
 
 def broken_screen(unit):
     sounds.play('broke')
-    room.run_room(gui.Label("%s is broken" % unit.weapon.name, f.SMALL, txt_color=c.RED))
+    return gui.Label("%s is broken" % unit.weapon.name, f.SMALL, txt_color=c.RED)
 
 
 class BattleAnimation(gui.LinearLayout):
@@ -55,6 +55,7 @@ class BattleAnimation(gui.LinearLayout):
         self.add_children(self.att_stats, self.def_stats)
         self.at = self.dt = self.round = 0
         self.outcome = self.damage = None
+        self.callback = kwargs.get('callback', None)  # called without arguments when the aftermath is over
 
     def begin(self):
         super().begin()
@@ -78,7 +79,7 @@ class BattleAnimation(gui.LinearLayout):
         print(att_str % (self.defending.name, self.dt, _("time") if self.dt == 1 else _("times")))
         self.attacking.team.play_music('battle')
 
-        room.run_room(rooms.Fadeout(2000, stop_mixer=False))
+        room.push(rooms.Fadeout(2000, stop_mixer=False))
 
     def anim_finished(self, tween):
         tween.go_backward(False)
@@ -145,29 +146,34 @@ class BattleAnimation(gui.LinearLayout):
             self.next_round()
 
     @staticmethod
-    def exp_or_die(unit1: Unit, unit2: Unit) -> None:
+    def exp_or_die(unit1: Unit, unit2: Unit):
         if unit1.health > 0:
             unit1.gain_exp(unit2)
-            room.run_room(ExperienceAnimation(unit1))
+            yield ExperienceAnimation(unit1)
         else:
             s.loaded_map.kill_unit(unit1)
 
     def end(self):
         super().end()
+        room.push_sequence(self.aftermath(), self.callback)
 
+    def aftermath(self):
+        """
+        Scenes shown after the battle, one after the other.
+        """
         if self.attacking.weapon and self.attacking.weapon.uses == 0:
-            broken_screen(self.attacking)
+            yield broken_screen(self.attacking)
         if self.defending.weapon and self.defending.weapon.uses == 0:
-            broken_screen(self.defending)
+            yield broken_screen(self.defending)
 
-        room.run_room(rooms.Fadeout(500))
+        yield rooms.Fadeout(500)
 
         self.attacking.team.play_music('map', True)
 
         self.attacking.played = True
 
-        self.exp_or_die(self.attacking, self.defending)
-        self.exp_or_die(self.defending, self.attacking)
+        yield from self.exp_or_die(self.attacking, self.defending)
+        yield from self.exp_or_die(self.defending, self.attacking)
 
         s.loaded_map.sprites_layer.update()
 
@@ -189,7 +195,8 @@ class ExperienceAnimation(gui.LinearLayout):
         self.image = gui.Image(_unit.image, die_when_done=False)
         self.bar = gui.LifeBar(max=99, value=_unit.exp_prev, blocks_per_row=100, block_size=(2, 10),
                                life_color=c.YELLOW)
-        self.label = gui.Label(_("EXP: {experience}") + "\t" + _("LV: {level}"), f.SMALL, txt_color=c.YELLOW)
+        self.label = gui.Label(_("EXP: {experience}") + "\t" + _("LV: {level}"), f.SMALL, txt_color=c.YELLOW,
+                               glyphs=True)
         self.label.format(**_unit.__dict__)
         self.add_children(self.image, self.bar, self.label)
         self.time = 0
@@ -13,22 +13,26 @@ class Fadeout(room.Room):
         self.clock = 0
         self.stop_mixer = stop_mixer
         self.percent = percent
+        self.alpha = None
 
     def begin(self):
         super().begin()
         if self.stop_mixer:
             pygame.mixer.music.fadeout(self.duration)
-        self.fade = display.window.copy()
+        self.fade = display.snapshot()
+        self.alpha = None
         self.resize(self.fade.get_size())
         display.tick()
 
     def loop(self, _events, dt):
         super().loop(_events, dt)
         alpha = int(gui.tween.linear(self.clock, 255, -int(255 * self.percent), self.duration))
-        self.fade.set_alpha(alpha)
+        if alpha != self.alpha:
+            self.alpha = alpha
+            self.fade.set_alpha(alpha)
+            self.valid = False
         self.clock += dt
         self.done = self.clock >= self.duration
-        self.valid = False
 
     def draw(self):
         self.surface.fill(c.BLACK)
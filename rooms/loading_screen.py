@@ -0,0 +1,51 @@
+"""
+
+"""
+
+
+import logging
+
+import gui
+import loader
+import room
+import rooms
+import colors as c
+import fonts as f
+
+from room import Gravity, Layout, LayoutParams
+
+
+class LoadingScreen(gui.LinearLayout):
+    """
+    Loads a map showing the progress. If loading fails, the error is shown and the map menu comes back.
+    Loading is a task (see Room.start_task), so the screen must be run by room.run_room_async.
+    """
+
+    def __init__(self, map_path, background):
+        super().__init__(wait=False, layout=Layout(width=LayoutParams.FILL_PARENT, height=LayoutParams.FILL_PARENT),
+                         default_child_gravity=Gravity.CENTER, background=background, spacing=20)
+        self.map_path = map_path
+        self.loader = None
+        self.title = gui.Label(_("Loading..."), f.MAIN_MENU, txt_color=c.ICE)
+        self.stage_label = gui.Label("{0}", f.MAIN, txt_color=c.ICE)
+        self.bar = gui.LifeBar(points=20, value=0, life_color=c.ICE, damage_color=c.MENU_BG)
+        self.add_children(self.title, self.stage_label, self.bar)
+
+    def begin(self):
+        super().begin()
+        self.loader = loader.MapLoader(self.map_path)
+        self.start_task(self.loader.load(), self.loaded)
+
+    def loop(self, _events, dt):
+        super().loop(_events, dt)
+        self.stage_label.format(self.loader.stage)
+        self.bar.value = int(self.loader.progress * self.bar.points)
+
+    def loaded(self, *args):
+        self.done = True
+        if self.loader.error is not None:
+            msg = _("Error while loading map \"%s\"! Please report this issue.\n\n%s") % (
+                self.map_path, self.loader.error)
+            logging.error(msg)
+            self.next = rooms.MapMenu(self.background)
+            room.push(gui.Dialog(msg, f.MONOSPACE, layout=Layout(gravity=Gravity.FILL), padding=25))
@@ -23,6 +23,7 @@ class MainMenu(gui.LinearLayout):
         self.hmenu = gui.HorizontalMenu([(_("License"), self.show_license), (_("Settings"), self.settings_menu)],
                                         f.SMALL, die_when_done=False, layout=Layout(gravity=Gravity.BOTTOMRIGHT))
         self.add_children(self.click_to_start, self.hmenu)
+        self.settings = None  # created the first time it's shown, then reused
         self.bind_keys((pl.K_RETURN, pl.K_SPACE), self.show_map_menu)
         self.bind_click((1,), self.show_map_menu, self.hmenu.rect, False)
 
@@ -36,7 +37,9 @@ class MainMenu(gui.LinearLayout):
         self.next.next = self
 
     def settings_menu(self, *_):
-        self.next = SettingsMenu()
+        if self.settings is None:
+            self.settings = SettingsMenu()
+        self.next = self.settings
         self.done = True
         self.next.next = self
 
@@ -53,9 +56,9 @@ class SettingsMenu(gui.LinearLayout):
         super().__init__(padding=30, layout=Layout(gravity=Gravity.FILL),
                          background=gui.NinePatch(resources.load_image('WindowBorder.png'), (70, 70)))
         self.back_btn = gui.Button(_("Go Back"), f.MAIN, callback=lambda *_: setattr(self, 'done', True),
-                                   layout=Layout(gravity=Gravity.BOTTOMRIGHT))
-        self.title = gui.Label(_("Settings"), f.MAIN)
-        self.display_label = gui.Label(_("Display"), f.SMALL)
+                                   layout=Layout(gravity=Gravity.BOTTOMRIGHT), die_when_done=False)
+        self.title = gui.Label(_("Settings"), f.MAIN, die_when_done=False)
+        self.display_label = gui.Label(_("Display"), f.SMALL, die_when_done=False)
 
         # use a set comprehension to filter duplicates and too small resolutions
         # However sets are not guaranteed to be ordered in every python
@@ -68,7 +71,8 @@ class SettingsMenu(gui.LinearLayout):
             display.set_resolution(resolutions[0])
             display.toggle_fullscreen()
 
-        self.fullscreen_btn = gui.CheckBox(_("Toggle Fullscreen"), f.SMALLER, callback=toggle_fullscreen)
+        self.fullscreen_btn = gui.CheckBox(_("Toggle Fullscreen"), f.SMALLER, callback=toggle_fullscreen,
+                                           die_when_done=False)
 
         def res_setter(res):
             return lambda *_: display.set_resolution(res)
@@ -76,7 +80,7 @@ class SettingsMenu(gui.LinearLayout):
         entries = [("{0[0]}x{0[1]}".format(res), res_setter(res)) for res in resolutions]
         self.resolutions_menu = gui.Menu(entries, f.SMALLER, die_when_done=False)
 
-        self.lang_label = gui.Label(_("Language"), f.SMALL)
+        self.lang_label = gui.Label(_("Language"), f.SMALL, die_when_done=False)
 
         def lang_setter(lang):
             def lang_set(*_):
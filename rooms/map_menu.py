@@ -1,14 +1,10 @@
-import logging
-import traceback
 import pygame
 
-import room
 import rooms
 import gui
 import resources
 import colors as c
 import fonts as f
-import state as s
 
 from room import Gravity, Layout, LayoutParams
 
@@ -32,17 +28,8 @@ class MapMenu(gui.LinearLayout):
         self.next = rooms.MainMenu()
 
     def chosen(self, menu, choice):
-        map_path = resources.map_path(choice)
-        try:
-            s.load_map(map_path)
-        except:
-            msg = _("Error while loading map \"%s\"! Please report this issue.\n\n%s") % (
-            map_path, traceback.format_exc())
-            logging.error(msg)
-            dialog = gui.Dialog(msg, f.MONOSPACE, layout=Layout(gravity=Gravity.FILL), padding=25)
-            room.run_room(dialog)
-        else:
-            self.done = True
+        self.next = rooms.LoadingScreen(resources.map_path(choice), self.background)
+        self.done = True
 
     def handle_mousebuttondown(self, event: pygame.event.Event):
         if event.button == pygame.BUTTON_RIGHT:
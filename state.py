@@ -14,10 +14,13 @@ units_manager: Union[None, unit.UnitsManager] = None
 winner: Union[None, unit.Team] = None
 
 
-def load_map(map_path):
+def load_map(map_path, **kwargs):
+    """
+    Builds the map and makes it the current one. kwargs are passed to map.Map.
+    """
     global loaded_map, units_manager, winner
 
     size = display.get_size()
     winner = None
-    loaded_map = map.Map(map_path, w=size[0]-250, h=size[1])
+    loaded_map = map.Map(map_path, w=size[0]-250, h=size[1], **kwargs)
     units_manager = loaded_map.units_manager
@@ -0,0 +1,90 @@
+"""
+Pool of surfaces, bucketed by size and by per pixel alpha.
+
+Rooms come and go all the time (cursor animations, labels, menus) and resize when the layout changes: instead of
+allocating a new surface every time, they acquire one from the pool and release it when they are done with it.
+"""
+
+import logging
+
+from typing import Dict, List, Tuple
+
+import pygame
+
+import utils
+
+
+Key = Tuple[int, int, bool]  # width, height, per pixel alpha
+
+EMPTY = pygame.Surface((0, 0))  #: shared zero sized surface for rooms without one of their own: drawing on it is a no-op
+
+
+class SurfacePool(object):
+    """
+    Keeps up to max_per_bucket released surfaces of every (width, height, alpha) to be handed out again by acquire.
+
+    Released surfaces must not be used anymore by whoever released them: they will be given to someone else.
+    """
+
+    def __init__(self, max_per_bucket: int = 4):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_per_bucket = max_per_bucket
+        self.buckets: Dict[Key, List[pygame.Surface]] = {}
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(map(len, self.buckets.values()))
+
+    def acquire(self, size: Tuple[int, int], alpha: bool = False) -> pygame.Surface:
+        """
+        Returns a surface of the given size, with the display pixel format if there is a display. Its pixels are
+        garbage: fill it before use.
+        :param size: width and height.
+        :param alpha: whether the surface needs per pixel alpha.
+        """
+        w, h = size
+        if w <= 0 or h <= 0:
+            return EMPTY
+        bucket = self.buckets.get((w, h, alpha))
+        if bucket:
+            self.hits += 1
+            return bucket.pop()
+        self.misses += 1
+        return utils.convert(pygame.Surface((w, h), flags=pygame.SRCALPHA if alpha else 0))
+
+    def release(self, surface: pygame.Surface) -> None:
+        """
+        Gives back a surface obtained with acquire. Surfaces beyond max_per_bucket are left to the garbage collector.
+        """
+        w, h = surface.get_size()
+        if w <= 0 or h <= 0:
+            return
+        bucket = self.buckets.setdefault((w, h, bool(surface.get_flags() & pygame.SRCALPHA)), [])
+        if len(bucket) < self.max_per_bucket:
+            surface.set_clip(None)
+            surface.set_colorkey(None)
+            surface.set_alpha(None)
+            bucket.append(surface)
+
+    def clear(self) -> None:
+        """
+        Drops all the pooled surfaces, e.g. when the display format changes.
+        """
+        self.buckets.clear()
+
+
+pool = SurfacePool()
+
+
+def acquire(size: Tuple[int, int], alpha: bool = False) -> pygame.Surface:
+    """
+    Acquires a surface from the default pool. See SurfacePool.acquire.
+    """
+    return pool.acquire(size, alpha)
+
+
+def release(surface: pygame.Surface) -> None:
+    """
+    Releases a surface to the default pool. See SurfacePool.release.
+    """
+    pool.release(surface)
@@ -34,7 +34,7 @@
 # Fixed: last row and last column of the map were not considered
 
 import sys
-import struct
+import array
 import pygame
 import os.path
 import zlib
@@ -44,6 +44,7 @@ from pygame import Rect
 from xml.etree import ElementTree
 from base64 import b64decode
 
+from atlas import Atlas
 from basictypes import Point
 
 
@@ -87,10 +88,17 @@ class Tile(object):
     def __repr__(self):
         return '<Tile %d>' % self.gid
 
-    def set_zoom(self, zoom):
+    def set_zoom(self, zoom, atlas=None):
+        """
+        Rescale the tile. If an Atlas is given, the scaled tile is packed in it.
+        """
         if zoom != self.zoom:
             size = self.tile_width * zoom, self.tile_height * zoom
-            self.scaled = pygame.transform.scale(self.surface, size)
+            if atlas is None:
+                self.scaled = pygame.transform.scale(self.surface, size)
+            else:
+                atlas.set_scale(zoom)
+                self.scaled = atlas.add_scaled(('tile', self.gid), self.surface, size)
             self.zoom = zoom
 
 
@@ -104,12 +112,15 @@ class Tileset(object):
         self.properties = {}
 
     @classmethod
-    def fromxml(cls, tag, pwd, firstgid=None):
+    def fromxml(cls, tag, pwd, firstgid=None, files=None):
         if 'source' in tag.attrib:
             firstgid = int(tag.attrib['firstgid'])
-            with open(os.path.join(pwd, tag.attrib['source'])) as f:
-                tileset = ElementTree.fromstring(f.read())
-            return cls.fromxml(tileset, pwd, firstgid)
+            path = os.path.join(pwd, tag.attrib['source'])
+            if files is not None and path in files.xml:
+                tileset = files.xml[path]
+            else:
+                tileset = read_xml(path)
+            return cls.fromxml(tileset, pwd, firstgid, files)
 
         name = tag.attrib['name']
         if firstgid is None:
@@ -123,14 +134,21 @@ class Tileset(object):
             if c.tag == "image":
                 # create a tileset
                 filename = os.path.join(pwd, c.attrib['source'])
-                tileset.add_image(filename)
+                tileset.add_image(filename, files.images.get(filename) if files is not None else None)
             elif c.tag == 'tile':
                 gid = tileset.firstgid + int(c.attrib['id'])
                 tileset.get_tile(gid).load_xml(c)
         return tileset
 
-    def add_image(self, file):
-        image = pygame.image.load(file).convert_alpha()
+    def add_image(self, file, image=None):
+        """
+        Slices an image in tiles.
+        :param file: path of the image.
+        :param image: the image already decoded (e.g. by MapFiles), not converted yet. Loaded from file if None.
+        """
+        if image is None:
+            image = pygame.image.load(file)
+        image = image.convert_alpha()
         if not image:
             sys.exit("Error creating new Tileset: file %s not found" % file)
         gid = self.firstgid
@@ -152,6 +170,137 @@ class Tilesets(dict):
             self[i] = tile
 
 
+class PropertyIndex(object):
+    """
+    Inverted index from property names and values to the items (Cells or Objects) that have them.
+
+    Items are stored under a hashable key (a Cell's (x, y) index or the Object itself) in insertion ordered
+    dicts, so that lookups cost O(results) instead of a scan over the whole layer.
+
+    Items must support the "in" operator, item access and keys() like Cell and Object do.
+    """
+
+    _UNHASHABLE = object()  # bucket for property values that can't be used as dict keys
+
+    def __init__(self):
+        self.by_name = {}  # name -> {key: item}
+        self.by_value = {}  # name -> {value: {key: item}}
+
+    def add(self, key, item, names=None):
+        """
+        Index the given property names of item (all of its properties by default).
+        """
+        for name in item.keys() if names is None else names:
+            if name not in item:
+                continue
+            value = item[name]
+            self.by_name.setdefault(name, {})[key] = item
+            values = self.by_value.setdefault(name, {})
+            try:
+                bucket = values.setdefault(value, {})
+            except TypeError:
+                bucket = values.setdefault(self._UNHASHABLE, {})
+            bucket[key] = item
+
+    def discard(self, key, item, names=None):
+        """
+        Remove the given property names of item (all of its properties by default) from the index.
+        """
+        for name in item.keys() if names is None else names:
+            if name not in item:
+                continue
+            value = item[name]
+            having = self.by_name.get(name, {})
+            having.pop(key, None)
+            if not having:
+                self.by_name.pop(name, None)
+            values = self.by_value.get(name, {})
+            try:
+                bucket = values.get(value, {})
+            except TypeError:
+                value, bucket = self._UNHASHABLE, values.get(self._UNHASHABLE, {})
+            bucket.pop(key, None)
+            if not bucket:
+                values.pop(value, None)
+            if not values:
+                self.by_value.pop(name, None)
+
+    def clear(self):
+        self.by_name.clear()
+        self.by_value.clear()
+
+    def having(self, name):
+        """
+        Return the list of items that have the property name set.
+        """
+        return list(self.by_name.get(name, {}).values())
+
+    def matching(self, name, value):
+        """
+        Return the list of items that have the property name set to value.
+        """
+        values = self.by_value.get(name)
+        if not values:
+            return []
+        try:
+            r = list(values.get(value, {}).values())
+        except TypeError:
+            # value can't be hashed: fall back to comparing every indexed value of this property
+            return [item for bucket in values.values() for item in bucket.values() if item[name] == value]
+        unhashable = values.get(self._UNHASHABLE)
+        if unhashable:
+            r.extend(item for item in unhashable.values() if item[name] == value)
+        return r
+
+
+class SpatialGrid(object):
+    """
+    Uniform grid spatial index of rectangular items having left, top, right and bottom attributes.
+
+    Every item is registered in each bucket its rect overlaps, so a region query only has to look at the
+    buckets the region overlaps.
+    """
+
+    def __init__(self, bucket_width, bucket_height):
+        self.bucket_width = max(1, int(bucket_width))
+        self.bucket_height = max(1, int(bucket_height))
+        self.buckets = {}  # (i, j) -> {item: None}
+
+    def _span(self, x1, y1, x2, y2):
+        bw, bh = self.bucket_width, self.bucket_height
+        return ((i, j)
+                for i in range(int(x1 // bw), int(x2 // bw) + 1)
+                for j in range(int(y1 // bh), int(y2 // bh) + 1))
+
+    def add(self, item):
+        for bucket in self._span(item.left, item.top, item.right, item.bottom):
+            self.buckets.setdefault(bucket, {})[item] = None
+
+    def discard(self, item):
+        for bucket in self._span(item.left, item.top, item.right, item.bottom):
+            items = self.buckets.get(bucket)
+            if items is not None:
+                items.pop(item, None)
+                if not items:
+                    del self.buckets[bucket]
+
+    def clear(self):
+        self.buckets.clear()
+
+    def query(self, x1, y1, x2, y2):
+        """
+        Return the set of items registered in the buckets overlapping the given region.
+
+        These are only candidates: callers have to perform the exact intersection test.
+        """
+        found = set()
+        for bucket in self._span(x1, y1, x2, y2):
+            items = self.buckets.get(bucket)
+            if items:
+                found.update(items)
+        return found
+
+
 class Cell(object):
     """
     Layers are made of Cells (or empty space).
@@ -184,6 +333,7 @@ class Cell(object):
         self.center = (px + tile.tile_width // 2, py + tile.tile_height // 2)
         self._added_properties = {}
         self._deleted_properties = set()
+        self.layer = None  # the Layer whose property index must be kept up to date
 
     def __repr__(self):
         return '<Cell %s,%s %d>' % (self.px, self.py, self.tile.gid)
@@ -203,11 +353,24 @@ class Cell(object):
         raise KeyError(key)
 
     def __setitem__(self, key, value):
+        if self.layer is not None:
+            self.layer.index.discard((self.x, self.y), self, (key,))
         self._added_properties[key] = value
+        if self.layer is not None:
+            self.layer.index.add((self.x, self.y), self, (key,))
 
     def __delitem__(self, key):
+        if self.layer is not None:
+            self.layer.index.discard((self.x, self.y), self, (key,))
         self._deleted_properties.add(key)
 
+    def keys(self):
+        """
+        Return the names of the properties set on this cell.
+        """
+        return [key for key in {**self.tile.properties, **self._added_properties}
+                if key not in self._deleted_properties]
+
     def intersects(self, other):
         """
         Determine whether this Cell intersects with the other rect (which has
@@ -226,24 +389,19 @@ class Cell(object):
 
 class LayerIterator(object):
     """
-    Iterates over all the cells in a layer in column,row order.
+    Iterates over all the non-empty cells in a layer in row, column order.
+
+    Empty cells are skipped by filtering the layer's flat grid, so no recursion nor index tuples are involved.
     """
 
     def __init__(self, layer):
-        self.layer = layer
-        self.i, self.j = 0, 0
+        self.cells = filter(None, layer.grid)
+
+    def __iter__(self):
+        return self
 
     def __next__(self):
-        if self.i == self.layer.width:
-            self.j += 1
-            self.i = 0
-        if self.j == self.layer.height:
-            raise StopIteration()
-        value = self.layer[self.i, self.j]
-        self.i += 1
-        if value is None:
-            return self.__next__()
-        return value
+        return next(self.cells)
 
 
 class Layer(object):
@@ -259,6 +417,11 @@ class Layer(object):
         properties - any properties set for this Layer
         cells - a dict of all the Cell instances for this Layer, keyed off
                 (x, y) index.
+        grid - a flat list of width * height Cells (or None) in row, column
+               order, used for iteration.
+        gids - an array of width * height tile gids (0 means empty) in row,
+               column order.
+        index - a PropertyIndex of the cells, used by find and match.
 
     Additionally you may look up a cell using direct item access:
 
@@ -278,9 +441,13 @@ class Layer(object):
         self.width = tmap.width
         self.height = tmap.height
         self.tilesets = tmap.tilesets
+        self.atlas = tmap.atlas
         self.group = pygame.sprite.Group()
         self.properties = {}
         self.cells = {}
+        self.grid = [None] * (self.width * self.height)
+        self.gids = array.array('i', bytes(4 * self.width * self.height))
+        self.index = PropertyIndex()
         self.view_x, self.view_y = 0, 0
         self.view_w, self.view_h = 0, 0
         self.zoom = 1
@@ -294,41 +461,66 @@ class Layer(object):
     def __setitem__(self, pos, tile):
         x, y = pos
         px = x * self.tile_width
-        py = y * self.tile_width
-        self.cells[pos] = Cell(x, y, px, py, tile)
+        py = y * self.tile_height
+        old = self.cells.get(pos)
+        if old is not None:
+            self.index.discard(pos, old)
+            old.layer = None
+        cell = self.cells[pos] = Cell(x, y, px, py, tile)
+        cell.layer = self
+        self.index.add(pos, cell)
+        self.grid[y * self.width + x] = cell
+        self.gids[y * self.width + x] = tile.gid
+        tile.set_zoom(self.zoom, self.atlas)
 
     def __iter__(self):
         return LayerIterator(self)
 
+    def iter_gids(self):
+        """
+        Generate (x, y, gid) for every non-empty cell in row, column order, straight from the gids array.
+        """
+        width = self.width
+        for i, gid in enumerate(self.gids):
+            if gid > 0:
+                y, x = divmod(i, width)
+                yield x, y, gid
+
     @classmethod
-    def fromxml(cls, tag, tmap):
+    def fromxml(cls, tag, tmap, gids=None):
         offset = (int(tag.attrib.get('offsetx', 0)), int(tag.attrib.get('offsety', 0)))
         layer = cls(tag.attrib['name'], int(tag.attrib.get('visible', 1)), offset, tmap)
 
-        data_tag = tag.find('data')
-        if data_tag is None:
-            raise ValueError('layer %s does not contain <data>' % layer.name)
-
-        data = data_tag.text.strip()
-        data = data.encode()  # Convert to bytes
-        # Decode from base 64 and decompress via zlib
-        data = b64decode(data)
-        if data_tag.attrib["compression"] == "gzip":
-            data = gzip.decompress(data)
-        elif data_tag.attrib["compression"] == "zlib":
-            data = zlib.decompress(data)
-        data = struct.unpack('<%di' % (len(data) / 4,), data)
-        assert len(data) == layer.width * layer.height
-        for i, gid in enumerate(data):
+        if gids is None:
+            data_tag = tag.find('data')
+            if data_tag is None:
+                raise ValueError('layer %s does not contain <data>' % layer.name)
+            gids = decode_data(data_tag)
+        assert len(gids) == layer.width * layer.height
+        width = layer.width
+        for i, gid in enumerate(gids):
             if gid < 1:
                 continue  # not set
             tile = tmap.tilesets[gid]
-            x = i % layer.width
-            y = i // layer.width
+            y, x = divmod(i, width)
             layer.cells[x, y] = Cell(x, y, x * tmap.tile_width, y * tmap.tile_height, tile)
 
+        layer.reindex()
         return layer
 
+    def reindex(self):
+        """
+        Rebuild the property index, grid and gids from self.cells. Needed only if self.cells was modified directly.
+        """
+        self.index.clear()
+        self.grid = [None] * (self.width * self.height)
+        self.gids = array.array('i', bytes(4 * self.width * self.height))
+        for pos, cell in self.cells.items():
+            cell.layer = self
+            self.index.add(pos, cell)
+            self.grid[cell.y * self.width + cell.x] = cell
+            self.gids[cell.y * self.width + cell.x] = cell.tile.gid
+
     def update(self, dt, *args):
         pass
 
@@ -336,9 +528,11 @@ class Layer(object):
         self.view_x, self.view_y = x, y
         self.view_w, self.view_h = w, h
         self.position = (x, y)
+        if zoom != self.zoom:
+            for gid in set(self.gids):
+                if gid > 0:
+                    self.tilesets[gid].set_zoom(zoom, self.atlas)
         self.zoom = zoom
-        for cell in self:
-            cell.tile.set_zoom(zoom)
 
     def draw(self, surface):
         """
@@ -362,9 +556,7 @@ class Layer(object):
         """
         r = []
         for propname in properties:
-            for cell in list(self.cells.values()):
-                if cell and propname in cell:
-                    r.append(cell)
+            r.extend(sorted(self.index.having(propname), key=lambda cell: (cell.y, cell.x)))
         return r
 
     def match(self, **properties):
@@ -372,12 +564,8 @@ class Layer(object):
         Find all cells with the given properties set to the given values.
         """
         r = []
-        for propname in properties:
-            for cell in list(self.cells.values()):
-                if propname not in cell:
-                    continue
-                if properties[propname] == cell[propname]:
-                    r.append(cell)
+        for propname, value in properties.items():
+            r.extend(sorted(self.index.matching(propname, value), key=lambda cell: (cell.y, cell.x)))
         return r
 
     def collide(self, rect, propname):
@@ -474,6 +662,7 @@ class Object(object):
         self.tile = tile
         self.visible = visible
         self.properties = {}
+        self.layer = None  # the ObjectLayer whose property index must be kept up to date
 
         self._added_properties = {}
         self._deleted_properties = set()
@@ -505,11 +694,25 @@ class Object(object):
         raise KeyError(key)
 
     def __setitem__(self, key, value):
+        if self.layer is not None:
+            self.layer.index.discard(self, self, (key,))
         self._added_properties[key] = value
+        if self.layer is not None:
+            self.layer.index.add(self, self, (key,))
 
     def __delitem__(self, key):
+        if self.layer is not None:
+            self.layer.index.discard(self, self, (key,))
         self._deleted_properties.add(key)
 
+    def keys(self):
+        """
+        Return the names of the properties set on this object (layer properties excluded).
+        """
+        tile_properties = self.tile.properties if self.tile else {}
+        return [key for key in {**tile_properties, **self.properties, **self._added_properties}
+                if key not in self._deleted_properties]
+
     def draw(self, surface, view_x, view_y, zoom):
         if not self.visible:
             return
@@ -563,6 +766,9 @@ class Object(object):
             return False
         return True
 
+    def contains(self, x, y):
+        return self.px <= x < self.px + self.width and self.py <= y < self.py + self.height
+
 
 class ObjectLayer(object):
     """
@@ -579,10 +785,14 @@ class ObjectLayer(object):
         opacity - the opacity of the layer as a value from 0 to 1.
         visible - whether the layer is shown (1) or hidden (0).
         objects - the objects in this Layer (Object instances)
+        index - a PropertyIndex of the objects, used by find and match.
+        grid - a SpatialGrid of the objects, used by get_in_region and get_at.
+
+    Use add, remove or item assignment to change the objects, so that index and grid are kept up to date.
     """
 
     def __init__(self, name, color, objects, opacity=1.0,
-                 visible=1, position=(0, 0)):
+                 visible=1, position=(0, 0), grid_size=(32, 32)):
         self.name = name
         self.color = color
         self.objects = objects
@@ -593,6 +803,10 @@ class ObjectLayer(object):
         self.view_x, self.view_y = 0, 0
         self.view_w, self.view_h = 0, 0
         self.zoom = 1
+        self.index = PropertyIndex()
+        self.grid = SpatialGrid(*grid_size)
+        self._order = {}  # Object -> sort key that follows the order of self.objects
+        self.reindex()
 
     def __repr__(self):
         return '<ObjectLayer "%s" at 0x%x>' % (self.name, id(self))
@@ -600,13 +814,61 @@ class ObjectLayer(object):
     def __getitem__(self, item):
         return self.objects[item]
 
+    def __setitem__(self, item, obj):
+        old = self.objects[item]
+        order = self._order[old]
+        self._unregister(old)
+        self.objects[item] = obj
+        self._register(obj, order)
+
+    def _register(self, obj, order):
+        obj.layer = self
+        self._order[obj] = order
+        self.index.add(obj, obj)
+        self.grid.add(obj)
+
+    def _unregister(self, obj):
+        self.index.discard(obj, obj)
+        self.grid.discard(obj)
+        del self._order[obj]
+        obj.layer = None
+
+    def _sorted(self, objects):
+        return sorted(objects, key=self._order.__getitem__)
+
+    def add(self, obj):
+        """
+        Append an Object to this layer.
+        """
+        order = self._order[self.objects[-1]] + 1 if self.objects else 0
+        self.objects.append(obj)
+        self._register(obj, order)
+
+    def remove(self, obj):
+        """
+        Remove an Object from this layer.
+        """
+        self.objects.remove(obj)
+        self._unregister(obj)
+
+    def reindex(self):
+        """
+        Rebuild index and grid from scratch. Needed only if self.objects was modified directly.
+        """
+        self.index.clear()
+        self.grid.clear()
+        self._order.clear()
+        for i, obj in enumerate(self.objects):
+            self._register(obj, i)
+
     @classmethod
     def fromxml(cls, tag, tmap):
         layer = cls(tag.attrib['name'], tag.attrib.get('color'), [],
                     float(tag.attrib.get('opacity', 1)),
-                    int(tag.attrib.get('visible', 1)))
+                    int(tag.attrib.get('visible', 1)),
+                    grid_size=(tmap.tile_width, tmap.tile_height))
         for obj in tag.findall('object'):
-            layer.objects.append(Object.fromxml(obj, tmap))
+            layer.add(Object.fromxml(obj, tmap))
         for c in tag.find('properties').findall('property'):
             # store additional properties.
             name = c.attrib['name']
@@ -638,30 +900,28 @@ class ObjectLayer(object):
 
     def find(self, *properties):
         """
-        Find all cells with the given properties set.
+        Find all objects with the given properties set, either on themselves or on this layer.
         """
         r = []
         for propname in properties:
-            for obj in self.objects:
-                if obj and propname in obj or propname in self.properties:
-                    r.append(obj)
+            if propname in self.properties:
+                r.extend(self.objects)
+            else:
+                r.extend(self._sorted(self.index.having(propname)))
         return r
 
     def match(self, **properties):
         """
         Find all objects with the given properties set to the given values.
+
+        Objects that don't set a property inherit it from this layer.
         """
         r = []
-        for propname in properties:
-            for obj in self.objects:
-                if propname in obj:
-                    val = obj[propname]
-                elif propname in self.properties:
-                    val = self.properties[propname]
-                else:
-                    continue
-                if properties[propname] == val:
-                    r.append(obj)
+        for propname, value in properties.items():
+            found = self.index.matching(propname, value)
+            if propname in self.properties and self.properties[propname] == value:
+                found.extend(obj for obj in self.objects if propname not in obj)
+            r.extend(self._sorted(found))
         return r
 
     def collide(self, rect, propname):
@@ -683,7 +943,8 @@ class ObjectLayer(object):
 
         Return a list of Object instances.
         """
-        return [obj for obj in self.objects if obj.intersects(x1, y1, x2, y2)]
+        candidates = self.grid.query(x1, y1, x2, y2)
+        return self._sorted(obj for obj in candidates if obj.intersects(x1, y1, x2, y2))
 
     def get_at(self, x, y):
         """
@@ -691,7 +952,7 @@ class ObjectLayer(object):
 
         Return an Object instance or None.
         """
-        for obj in self.objects:
+        for obj in self._sorted(self.grid.query(x, y, x, y)):
             if obj.contains(x, y):
                 return obj
 
@@ -714,7 +975,7 @@ class SpriteLayer(pygame.sprite.AbstractGroup):
     def draw(self, screen):
         ox, oy = self.position
         for sprite in self.sprites():
-            sx, sy = sprite.rect.topleft
+            sx, sy = sprite.draw_topleft() if hasattr(sprite, 'draw_topleft') else sprite.rect.topleft
             # Only the sprite's defined width and height will be drawn
             area = pygame.Rect((0, 0),
                                (int(sprite.rect.width),
@@ -732,11 +993,91 @@ class Layers(list):
         self.by_name[name] = layer
 
     def __getitem__(self, item):
-        if isinstance(item, int):
-            return self[item]
+        if isinstance(item, (int, slice)):
+            return super().__getitem__(item)
         return self.by_name[item]
 
 
+def read_xml(path):
+    with open(path) as f:
+        return ElementTree.fromstring(f.read())
+
+
+def decode_data(data_tag):
+    """
+    Decodes the content of a layer <data> tag.
+    :return: an array of the layer tile gids in row, column order.
+    """
+    data = data_tag.text.strip()
+    data = data.encode()  # Convert to bytes
+    # Decode from base 64 and decompress via zlib
+    data = b64decode(data)
+    if data_tag.attrib["compression"] == "gzip":
+        data = gzip.decompress(data)
+    elif data_tag.attrib["compression"] == "zlib":
+        data = zlib.decompress(data)
+    gids = array.array('i', data)  # little-endian 32 bit integers
+    if sys.byteorder == 'big':
+        gids.byteswap()
+    return gids
+
+
+class MapFiles(object):
+    """
+    The files a tmx map is made of, read and decoded but not turned into a TileMap yet.
+
+    Reading does all the slow work that doesn't need the display (file I/O, XML parsing, image decoding and layer
+    data decompression), so it can be done on a worker thread. Converting surfaces is left to TileMap.load.
+        xml - maps paths of the tmx and external tileset files to their parsed root element
+        images - maps paths of tileset images to their decoded, unconverted surface
+        gids - maps layer tags to their decoded gids array
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.xml = {}
+        self.images = {}
+        self.gids = {}
+
+    def read(self, report=None):
+        """
+        Reads everything.
+        :param report: optional callable, called with (done, total) after every file or layer.
+        """
+        pwd = os.path.dirname(self.filename)
+        tmap = self.xml[self.filename] = read_xml(self.filename)
+        tilesets = tmap.findall('tileset')
+        layers = tmap.findall('layer')
+        total = 1 + len(tilesets) + len(layers)
+        done = 1
+        if report:
+            report(done, total)
+        for tag in tilesets:
+            if 'source' in tag.attrib:
+                path = os.path.join(pwd, tag.attrib['source'])
+                tag = self.xml[path] = read_xml(path)
+            for image in tag.findall('image'):
+                path = os.path.join(pwd, image.attrib['source'])
+                self.images[path] = pygame.image.load(path)
+            done += 1
+            if report:
+                report(done, total)
+        for tag in layers:
+            data_tag = tag.find('data')
+            if data_tag is not None:  # Layer.fromxml will complain
+                self.gids[tag] = decode_data(data_tag)
+            done += 1
+            if report:
+                report(done, total)
+
+    def unit_names(self):
+        """
+        Returns the names of the unit objects placed on the map. Must be called after read.
+        """
+        tmap = self.xml[self.filename]
+        return [tag.attrib['name'] for tag in tmap.iter('object')
+                if tag.attrib.get('type') == 'unit' and 'name' in tag.attrib]
+
+
 class TileMap(object):
     """
     A TileMap is a collection of Layers which contain gridded maps or sprites
@@ -759,6 +1100,7 @@ class TileMap(object):
         properties - any properties set on the tilemap in the TMX file
         layers - all layers of this tilemap as a Layers instance
         tilesets - all tilesets of this tilemap as a Tilesets instance
+        atlas - an Atlas holding the images drawn at the current zoom
         fx, fy - viewport focus point
         view_w, view_h - viewport size
         view_x, view_y - viewport offset (origin)
@@ -778,6 +1120,7 @@ class TileMap(object):
         self.properties = {}
         self.layers = Layers()
         self.tilesets = Tilesets()
+        self.atlas = Atlas()
         self.fx, self.fy = 0, 0  # viewport focus point
         self.view_w, self.view_h = size  # viewport size
         self.view_x, self.view_y = origin  # viewport offset
@@ -816,9 +1159,15 @@ class TileMap(object):
             screen.blit(horizontal_line, (-self.childs_ox, -self.childs_oy + j * self.zoom_tile_height - 1))
 
     @classmethod
-    def load(cls, filename, viewport, origin=(0, 0)):
-        with open(filename) as f:
-            tmap = ElementTree.fromstring(f.read())
+    def load(cls, filename, viewport, origin=(0, 0), files=None):
+        """
+        Builds a TileMap from a tmx file.
+        :param files: the already read MapFiles of filename. If None, everything is read here.
+        """
+        if files is None:
+            files = MapFiles(filename)
+            files.read()
+        tmap = files.xml[filename]
 
         # get most general map informations and create a surface
         tilemap = TileMap(viewport, origin)
@@ -832,10 +1181,10 @@ class TileMap(object):
         tilemap.px_size = Point((tilemap.px_width, tilemap.px_height))
 
         for tag in tmap.findall('tileset'):
-            tilemap.tilesets.add(Tileset.fromxml(tag, os.path.dirname(filename)))
+            tilemap.tilesets.add(Tileset.fromxml(tag, os.path.dirname(filename), files=files))
 
         for tag in tmap.findall('layer'):
-            layer = Layer.fromxml(tag, tilemap)
+            layer = Layer.fromxml(tag, tilemap, files.gids.get(tag))
             tilemap.layers.add_named(layer, layer.name)
 
         for tag in tmap.findall('objectgroup'):
@@ -899,6 +1248,7 @@ class TileMap(object):
         self.childs_ox = x - self.view_x
         self.childs_oy = y - self.view_y
 
+        self.atlas.set_scale(self.zoom)
         for layer in self.layers:
             layer.set_view(x, y, w, h, self.zoom)
 
@@ -941,6 +1291,7 @@ class TileMap(object):
         self.childs_ox = x - self.view_x
         self.childs_oy = y - self.view_y
 
+        self.atlas.set_scale(self.zoom)
         for layer in self.layers:
             layer.set_view(x, y, w, h, self.zoom)
 
@@ -977,8 +1328,8 @@ class TileMap(object):
         return Point((sx, sy))
 
 
-def load(filename, viewport, origin=(0, 0)):
-    return TileMap.load(filename, viewport, origin)
+def load(filename, viewport, origin=(0, 0), files=None):
+    return TileMap.load(filename, viewport, origin, files)
 
 
 def main():
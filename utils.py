@@ -47,18 +47,26 @@ def timeit(f):
 
     return timed
 
-def parse_yaml(path, module):
+def load_yaml(path):
+    """
+    Reads and parses a yaml file, without building any game object.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def parse_yaml(path, module, data=None):
     """
     Parses yaml files used by the game and returns a dictionary that maps a name
     to a game object (unit, weapon, ...).
+    If data is given, it's used as the already parsed content of path.
     """
+    if data is None:
+        data = load_yaml(path)
     objects = {}
-    with open(path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-        for u in data:
-            u_class = module.__dict__[list(u.keys())[0]]
-            kwargs = list(u.values())[0]
-            objects[kwargs['name']] = u_class(**kwargs)
+    for u in data:
+        u_class = module.__dict__[list(u.keys())[0]]
+        kwargs = list(u.values())[0]
+        objects[kwargs['name']] = u_class(**kwargs)
     return objects
 
 def distance(p0: Coord, p1: Coord):
@@ -91,6 +99,34 @@ def center(rect1, rect2, xoffset=0, yoffset=0):
     """Center rect2 in rect1 with offset."""
     return (rect1.centerx - rect2.centerx + xoffset, rect1.centery - rect2.centery + yoffset)
 
+def merge_rects(rects):
+    """
+    Merges overlapping rects into their unions, so that an area is filled once even if many rects cover it.
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+def convert(surface):
+    """
+    Converts surface to the pixel format of the display, with per pixel alpha if it has it, so that it blits faster.
+    Before the display is created surface is returned as it is.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
 def return_to_os(*_):
     """
     Quits the game and returns to OS